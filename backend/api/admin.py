@@ -1,8 +1,15 @@
 from django.contrib import admin
-from .models import Candidate, JobOpening, Application, UserProfile, Notification
+from .models import Candidate, JobOpening, Application, UserProfile, Notification, Task, ResumeFile, Room, Interview, DepartmentAssignment, ImportJob, DuplicateCandidatePair
 
 admin.site.register(Candidate)
 admin.site.register(JobOpening)
 admin.site.register(Application)
 admin.site.register(UserProfile)
 admin.site.register(Notification)
+admin.site.register(Task)
+admin.site.register(ResumeFile)
+admin.site.register(Room)
+admin.site.register(Interview)
+admin.site.register(DepartmentAssignment)
+admin.site.register(ImportJob)
+admin.site.register(DuplicateCandidatePair)
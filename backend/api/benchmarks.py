@@ -0,0 +1,26 @@
+"""Helpers shared by the benchmark management commands."""
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def latency_summary(ms):
+    """'p50=… p95=… p99=…' for a list of latencies in milliseconds."""
+    return ' '.join(f'p{pct}={percentile(ms, pct):7.1f}ms' for pct in (50, 95, 99))
+
+
+def create_users(usernames, password):
+    """
+    Create users sharing one password hash. Hashing is deliberately slow and
+    creating users is not what the benchmarks measure. Users are saved one by
+    one so the post_save signal still gives each a profile.
+    """
+    hashed = make_password(password)
+    return [User.objects.create(username=username, password=hashed) for username in usernames]
@@ -0,0 +1,54 @@
+from django.db import transaction
+from django.db.models import Count
+
+from .models import Application, JobOpening
+
+COUNTER_FIELDS = JobOpening.COUNTER_FIELDS
+
+
+def count_applications(job_ids):
+    """Return {job_id: {counter_field: value}} computed from the applications table."""
+    counts = {job_id: dict.fromkeys(COUNTER_FIELDS, 0) for job_id in job_ids}
+    rows = (
+        Application.objects.filter(job_id__in=job_ids)
+        .values('job_id', 'status')
+        .annotate(n=Count('id'))
+        .order_by()
+    )
+    for row in rows:
+        job_counts = counts[row['job_id']]
+        job_counts['applications_count'] += row['n']
+        field = Application.STATUS_COUNTER_FIELDS.get(row['status'])
+        if field:
+            job_counts[field] += row['n']
+    return counts
+
+
+def recount_job_counters(job_ids=None, batch_size=500):
+    """
+    Recompute the denormalized counters of the given jobs (default: all).
+
+    Jobs are locked batch by batch while they are recounted, so concurrent
+    F() adjustments wait instead of being lost. Returns the number of jobs
+    whose stored counters were wrong.
+    """
+    jobs = JobOpening.objects.order_by('pk')
+    if job_ids is not None:
+        jobs = jobs.filter(pk__in=job_ids)
+    ids = list(jobs.values_list('pk', flat=True))
+
+    repaired = 0
+    for start in range(0, len(ids), batch_size):
+        batch = ids[start:start + batch_size]
+        with transaction.atomic():
+            stale = []
+            counts = count_applications(batch)
+            for job in JobOpening.objects.select_for_update().filter(pk__in=batch):
+                expected = counts[job.pk]
+                if any(getattr(job, field) != value for field, value in expected.items()):
+                    for field, value in expected.items():
+                        setattr(job, field, value)
+                    stale.append(job)
+            JobOpening.objects.bulk_update(stale, COUNTER_FIELDS)
+            repaired += len(stale)
+    return repaired
@@ -0,0 +1,279 @@
+"""
+Duplicate-candidate detection and merging.
+
+Every candidate is reduced to a normalized record (first name, last name,
+phone digits, email local part) and a handful of blocking keys: the phone
+number, the email local part, a Soundex code of the last name plus the first
+initial, and the trigrams of the last name plus the first initial. Only
+candidates sharing the phone or email key, or at least two name keys, are
+ever compared. Keys are hashed to integers and sorted once with numpy, so
+buckets are runs of equal hashes; buckets larger than DEDUPE_MAX_BUCKET
+(very common names) are skipped, which bounds the comparisons to a
+constant per candidate instead of all pairs.
+
+Each surviving pair is scored from Jaro-Winkler name and email similarity
+and exact phone agreement, and pairs scoring at least DEDUPE_MIN_SCORE are
+stored as DuplicateCandidatePair rows for HR to review, merge or dismiss.
+"""
+import re
+import unicodedata
+from functools import lru_cache
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+
+from .models import Application, Candidate, DuplicateCandidatePair, Interview, Notification, UserProfile
+
+READ_BATCH_SIZE = 10000
+WRITE_BATCH_SIZE = 5000
+MIN_SHARED_NAME_KEYS = 2
+NON_LETTERS = re.compile(r'[^a-z]')
+NON_DIGITS = re.compile(r'\D')
+SOUNDEX_CODES = {c: str(d) for d, letters in enumerate(['aeiouyhw', 'bfpv', 'cgjkqsxz', 'dt', 'l', 'mn', 'r']) for c in letters}
+# Blank fields on the kept candidate are filled in from the merged ones
+MERGE_FILL_FIELDS = ['phone', 'bio', 'linkedin', 'portfolio', 'resume', 'resume_file']
+# Which of two applications to the same job survives a merge: open ones
+# outrank closed ones, and further along the pipeline outranks earlier
+MERGE_STATUS_RANK = {'Withdrawn': 0, 'Rejected': 1, 'Received': 2, 'Under Review': 3, 'Interview': 4, 'Offer Extended': 5}
+
+
+# --- Normalization ---------------------------------------------------------
+
+def normalize_name(value):
+    value = unicodedata.normalize('NFKD', value or '')
+    return NON_LETTERS.sub('', ''.join(c for c in value if not unicodedata.combining(c)).lower())
+
+
+def normalize_phone(value):
+    """The last ten digits, ignoring formatting and country prefixes; '' if too short to compare."""
+    digits = NON_DIGITS.sub('', value or '')[-10:]
+    return digits if len(digits) >= 7 else ''
+
+
+def normalize_email_local(value):
+    """Email local part without +tags or dots, so j.smith+jobs@ and jsmith@ agree."""
+    local = (value or '').lower().partition('@')[0].partition('+')[0]
+    return local.replace('.', '')
+
+
+def soundex(name):
+    if not name:
+        return ''
+    codes = [SOUNDEX_CODES.get(c, '') for c in name]
+    result = name[0]
+    previous = codes[0]
+    for c, code in zip(name[1:], codes[1:]):
+        if code not in ('0', '', previous):
+            result += code
+        if c not in 'hw':
+            previous = code
+    return (result + '000')[:4]
+
+
+# Names repeat a lot across a large candidate table
+@lru_cache(maxsize=2 ** 18)
+def jaro_winkler(a, b):
+    if a == b:
+        return 1.0 if a else 0.0
+    if not a or not b:
+        return 0.0
+    window = max(max(len(a), len(b)) // 2 - 1, 0)
+    b_matched = [False] * len(b)
+    a_matches = []
+    for i, c in enumerate(a):
+        end = min(len(b), i + window + 1)
+        j = b.find(c, max(0, i - window), end)
+        while j != -1 and b_matched[j]:
+            j = b.find(c, j + 1, end)
+        if j != -1:
+            b_matched[j] = True
+            a_matches.append(c)
+    matches = len(a_matches)
+    if not matches:
+        return 0.0
+    b_matches = [c for c, matched in zip(b, b_matched) if matched]
+    transpositions = sum(x != y for x, y in zip(a_matches, b_matches)) / 2
+    jaro = (matches / len(a) + matches / len(b) + (matches - transpositions) / matches) / 3
+    prefix = 0
+    for x, y in zip(a[:4], b[:4]):
+        if x != y:
+            break
+        prefix += 1
+    return jaro + prefix * 0.1 * (1 - jaro)
+
+
+def blocking_keys(first, last, phone, local):
+    """(exact keys, name keys): phone and email local part, then Soundex and trigrams of the last name."""
+    exact = []
+    if phone:
+        exact.append('p' + phone)
+    if len(local) >= 3:
+        exact.append('e' + local)
+    names = []
+    if last:
+        initial = first[:1]
+        names.append('s' + soundex(last) + initial)
+        names.extend('g' + last[i:i + 3] + initial for i in range(max(len(last) - 2, 1)))
+    return exact, names
+
+
+# --- Scoring ---------------------------------------------------------------
+
+def score_pair(a, b):
+    """Score two normalized (first, last, phone, local) records; returns (score, reasons)."""
+    first_a, last_a, phone_a, local_a = a
+    first_b, last_b, phone_b, local_b = b
+    name = 0.4 * jaro_winkler(first_a, first_b) + 0.6 * jaro_winkler(last_a, last_b)
+    if name < 0.9:
+        # First and last name swapped between the two records
+        name = max(name, 0.4 * jaro_winkler(first_a, last_b) + 0.6 * jaro_winkler(last_a, first_b))
+    score, weight = 0.5 * name, 0.5
+    reasons = ['name'] if name >= 0.9 else []
+    # Missing phones or emails are no evidence either way, so they drop out of the weighting
+    if phone_a and phone_b:
+        weight += 0.3
+        if phone_a == phone_b:
+            score += 0.3
+            reasons.append('phone')
+    if local_a and local_b:
+        email = jaro_winkler(local_a, local_b)
+        score, weight = score + 0.2 * email, weight + 0.2
+        if email >= 0.9:
+            reasons.append('email')
+    return score / weight, reasons
+
+
+def _bucket_pairs(keys, rows, max_bucket):
+    """(i, j) row pairs, packed as i << 32 | j with i < j, for every bucket of at most `max_bucket` rows."""
+    keys = np.asarray(keys, dtype=np.int64)
+    rows = np.asarray(rows, dtype=np.int64)
+    order = np.argsort(keys, kind='stable')
+    keys, rows = keys[order], rows[order]
+    starts = np.concatenate([[0], np.flatnonzero(np.diff(keys)) + 1])
+    sizes = np.diff(np.concatenate([starts, [len(keys)]]))
+
+    pairs = [np.empty(0, dtype=np.int64)]
+    for size in np.unique(sizes[(sizes >= 2) & (sizes <= max_bucket)]):
+        # All buckets of one size at once: bucket start + every (i, j) offset pair
+        first, second = np.triu_indices(size, 1)
+        bucket_starts = starts[sizes == size][:, None]
+        a, b = rows[bucket_starts + first].ravel(), rows[bucket_starts + second].ravel()
+        pairs.append(np.minimum(a, b) << 32 | np.maximum(a, b))
+    pairs = np.concatenate(pairs)
+    # A row can sit in one bucket twice (a repeated trigram, or a hash collision)
+    return pairs[(pairs >> 32) != (pairs & 0xFFFFFFFF)]
+
+
+def _candidate_pairs(exact_keys, name_keys, max_bucket):
+    """
+    Unique row pairs worth scoring: those sharing a phone or email key, and
+    those sharing at least MIN_SHARED_NAME_KEYS name keys. One shared trigram
+    alone says little, and requiring two cuts the pairs to score several-fold.
+    """
+    exact = np.unique(_bucket_pairs(*exact_keys, max_bucket))
+    name, shared = np.unique(_bucket_pairs(*name_keys, max_bucket), return_counts=True)
+    return np.union1d(exact, name[shared >= MIN_SHARED_NAME_KEYS])
+
+
+def find_duplicates(min_score=None, max_bucket=None):
+    """Yield (candidate id, candidate id, score, reasons) for every likely duplicate pair."""
+    min_score = settings.DEDUPE_MIN_SCORE if min_score is None else min_score
+    max_bucket = max_bucket or settings.DEDUPE_MAX_BUCKET
+
+    ids, records = [], []
+    exact_keys, name_keys = ([], []), ([], [])
+    candidates = Candidate.objects.order_by().values_list('id', 'fName', 'lName', 'phone', 'email')
+    for candidate_id, first, last, phone, email in candidates.iterator(chunk_size=READ_BATCH_SIZE):
+        record = (normalize_name(first), normalize_name(last), normalize_phone(phone), normalize_email_local(email))
+        row = len(ids)
+        ids.append(candidate_id)
+        records.append(record)
+        exact, names = blocking_keys(*record)
+        for keys, values in ((exact_keys, exact), (name_keys, names)):
+            for key in values:
+                keys[0].append(hash(key))
+                keys[1].append(row)
+
+    pairs = _candidate_pairs(exact_keys, name_keys, max_bucket)
+    del exact_keys, name_keys
+    for pair in pairs.tolist():
+        a, b = pair >> 32, pair & 0xFFFFFFFF
+        score, reasons = score_pair(records[a], records[b])
+        if score >= min_score:
+            yield ids[a], ids[b], score, reasons
+
+
+def rebuild_duplicate_pairs(min_score=None, max_bucket=None):
+    """Replace the pending duplicate pairs; dismissed pairs stay dismissed. Returns the number found."""
+    found = 0
+    batch = []
+    with transaction.atomic():
+        DuplicateCandidatePair.objects.filter(status='PENDING').delete()
+        for a, b, score, reasons in find_duplicates(min_score, max_bucket):
+            found += 1
+            batch.append(DuplicateCandidatePair(
+                candidate_a_id=min(a, b), candidate_b_id=max(a, b), score=score, reasons=reasons,
+            ))
+            if len(batch) >= WRITE_BATCH_SIZE:
+                DuplicateCandidatePair.objects.bulk_create(batch, ignore_conflicts=True)
+                batch = []
+        DuplicateCandidatePair.objects.bulk_create(batch, ignore_conflicts=True)
+    return found
+
+
+# --- Merging ---------------------------------------------------------------
+
+@transaction.atomic
+def merge_candidates(keep_id, duplicate_ids):
+    """
+    Fold `duplicate_ids` into candidate `keep_id` and delete them.
+
+    Applications and user profiles are re-pointed with one UPDATE each. Job
+    counters are unaffected because job and status stay the same. Where
+    both candidates applied to the same job, the application with the most
+    advanced status survives (the kept candidate's on a tie), it takes over
+    the other's interviews and notifications, and the other is deleted
+    through the post_delete counter signal. Blank fields on the kept
+    candidate are filled in from the duplicates.
+    """
+    # All rows are locked in one query in id order, so concurrent merges cannot deadlock
+    locked = Candidate.objects.select_for_update().filter(pk__in=[keep_id, *duplicate_ids]).order_by('id')
+    candidates = {c.id: c for c in locked}
+    if keep_id not in candidates:
+        raise Candidate.DoesNotExist(f'Candidate {keep_id} does not exist.')
+    keep = candidates.pop(keep_id)
+    duplicates = list(candidates.values())
+    duplicate_ids = [d.id for d in duplicates]
+    if not duplicate_ids:
+        return keep
+
+    by_job = {}
+    applications = Application.objects.filter(candidate_id__in=[keep_id, *duplicate_ids]).values_list(
+        'id', 'job_id', 'candidate_id', 'status',
+    )
+    for application_id, job_id, candidate_id, status in applications:
+        rank = (MERGE_STATUS_RANK.get(status, -1), candidate_id == keep_id, -application_id)
+        by_job.setdefault(job_id, []).append((rank, application_id))
+    for ranked in by_job.values():
+        if len(ranked) < 2:
+            continue
+        ranked.sort(reverse=True)
+        survivor, extra = ranked[0][1], [application_id for _, application_id in ranked[1:]]
+        Interview.objects.filter(application_id__in=extra).update(application_id=survivor)
+        Notification.objects.filter(application_id__in=extra).update(application_id=survivor)
+        Application.objects.filter(pk__in=extra).delete()
+    Application.objects.filter(candidate_id__in=duplicate_ids).update(candidate_id=keep_id)
+    UserProfile.objects.filter(candidate_id__in=duplicate_ids).update(candidate_id=keep_id)
+
+    changed = []
+    for field in MERGE_FILL_FIELDS:
+        if not getattr(keep, field):
+            value = next((getattr(d, field) for d in duplicates if getattr(d, field)), None)
+            if value:
+                setattr(keep, field, value)
+                changed.append(field)
+    Candidate.objects.filter(pk__in=duplicate_ids).delete()
+    if changed:
+        keep.save(update_fields=changed)
+    return keep
@@ -0,0 +1,278 @@
+"""
+Bulk import of candidates and their applications from CSV or NDJSON.
+
+Files are processed by a background task in chunks of IMPORT_CHUNK_SIZE
+rows. Each chunk is validated with plain functions built once from the
+model field definitions, candidates are upserted by email with batched
+inserts/updates, and applications are inserted in one batch, all in one
+transaction per chunk. Progress and a per-row error report are stored on
+the ImportJob as the chunks complete. The uploaded file is deleted once
+the run ends, whether it succeeded or failed.
+"""
+import codecs
+import csv
+import json
+import logging
+import os
+import re
+from collections import Counter
+
+from django.conf import settings
+from django.core.files.uploadhandler import StopUpload, TemporaryFileUploadHandler
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Application, Candidate, ImportJob, JobOpening
+
+logger = logging.getLogger(__name__)
+
+FORMATS = {'.csv': 'csv', '.ndjson': 'ndjson', '.jsonl': 'ndjson'}
+CANDIDATE_FIELDS = ['fName', 'lName', 'email', 'phone', 'bio', 'linkedin', 'portfolio']
+REQUIRED_FIELDS = ['fName', 'lName', 'email']
+
+EMAIL_RE = re.compile(r'^[^@\s]+@[^@\s]+\.[^@\s]+$')
+URL_RE = re.compile(r'^https?://[^\s/$.?#][^\s]*$', re.IGNORECASE)
+
+
+def compile_validators():
+    """
+    Build {field: validate(value) -> (clean value, error or None)} from the models.
+
+    Length limits and choices come from the model fields, so the rules stay
+    in step with the schema, but each check is a plain closure instead of a
+    serializer/field instance per row.
+    """
+    validators = {}
+    for name in CANDIDATE_FIELDS + ['coverLetter']:
+        model = Candidate if name in CANDIDATE_FIELDS else Application
+        field = model._meta.get_field(name)
+        max_length = field.max_length
+        pattern = EMAIL_RE if name == 'email' else URL_RE if name in ('linkedin', 'portfolio') else None
+
+        def validate(value, max_length=max_length, pattern=pattern, name=name):
+            value = '' if value is None else str(value).strip()
+            if max_length and len(value) > max_length:
+                return value, f'Ensure this field has no more than {max_length} characters.'
+            if value and pattern is not None and not pattern.match(value):
+                return value, f'Enter a valid {"email address" if name == "email" else "URL"}.'
+            return value, None
+
+        validators[name] = validate
+
+    statuses = {choice for choice, _ in Application.STATUS_CHOICES}
+
+    def validate_status(value):
+        value = '' if value is None else str(value).strip()
+        value = value or 'Received'
+        return value, None if value in statuses else f'"{value}" is not a valid status.'
+
+    validators['status'] = validate_status
+    return validators
+
+
+def validate_row(row, validators, job_ids):
+    clean, errors = {}, {}
+    for name, validate in validators.items():
+        value, error = validate(row.get(name))
+        clean[name] = value
+        if error:
+            errors[name] = error
+    for name in REQUIRED_FIELDS:
+        if not clean[name] and name not in errors:
+            errors[name] = 'This field is required.'
+
+    job = str(row.get('job') or '').strip()  # NDJSON may give the id as a number
+    clean['job'] = None
+    if job:
+        if not job.isdigit() or int(job) not in job_ids:
+            errors['job'] = f'Job "{job}" does not exist.'
+        else:
+            clean['job'] = int(job)
+    return clean, errors
+
+
+class ImportUploadHandler(TemporaryFileUploadHandler):
+    """Spool an import file to disk chunk by chunk, up to IMPORT_MAX_UPLOAD_SIZE."""
+
+    def receive_data_chunk(self, raw_data, start):
+        if start + len(raw_data) > settings.IMPORT_MAX_UPLOAD_SIZE:
+            self.upload_interrupted()
+            raise StopUpload(connection_reset=True)
+        return super().receive_data_chunk(raw_data, start)
+
+
+def file_format(file_name, requested=None):
+    """'csv' or 'ndjson' from an explicit choice or the file extension, else None."""
+    if requested:
+        return requested if requested in FORMATS.values() else None
+    return FORMATS.get(os.path.splitext(file_name or '')[1].lower())
+
+
+def iter_rows(file, file_format):
+    """Yield dict rows from a binary file object without reading it whole."""
+    text = codecs.getreader('utf-8-sig')(file, errors='replace')
+    if file_format == 'csv':
+        yield from csv.DictReader(text)
+    else:
+        for line in text:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                row = None
+            yield row if isinstance(row, dict) else {'__invalid__': line[:200]}
+
+
+def _chunks(rows, size):
+    chunk = []
+    for number, row in enumerate(rows, start=1):
+        chunk.append((number, row))
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _upsert_candidates(valid):
+    """
+    Create or update the chunk's candidates by email. Returns ({email: id},
+    created, updated, ids of the created and updated candidates).
+    """
+    by_email = {}
+    for clean in valid:
+        # Later rows for the same email fill in fields earlier rows left blank
+        merged = by_email.setdefault(clean['email'], {})
+        for name in CANDIDATE_FIELDS:
+            if clean[name] or name not in merged:
+                merged[name] = clean[name]
+
+    existing = {c.email: c for c in Candidate.objects.filter(email__in=list(by_email))}
+    changed = []
+    for email, values in by_email.items():
+        candidate = existing.get(email)
+        if candidate is None:
+            continue
+        # Blank import values never erase what is already on file
+        updates = {name: value for name, value in values.items() if value and getattr(candidate, name) != value}
+        if updates:
+            for name, value in updates.items():
+                setattr(candidate, name, value)
+            changed.append(candidate)
+    Candidate.objects.bulk_update(changed, CANDIDATE_FIELDS, batch_size=1000)
+
+    new = [Candidate(**values) for email, values in by_email.items() if email not in existing]
+    # Conflicts here mean another writer created the email meanwhile; it is picked up below
+    Candidate.objects.bulk_create(new, batch_size=1000, ignore_conflicts=True)
+
+    ids = dict(Candidate.objects.filter(email__in=list(by_email)).values_list('email', 'id'))
+    touched = [candidate.id for candidate in changed] + [ids[c.email] for c in new if c.email in ids]
+    return ids, len(new), len(changed), touched
+
+
+def _create_applications(valid, candidate_ids):
+    pairs = {(candidate_ids[c['email']], c['job']): c for c in valid if c['job'] and c['email'] in candidate_ids}
+    if not pairs:
+        return 0
+    # Jobs were looked up when the run started; lock them so none is deleted
+    # before this chunk commits, and stop if one already was
+    job_ids = {job_id for _, job_id in pairs}
+    present = set(JobOpening.objects.select_for_update().filter(id__in=job_ids).values_list('id', flat=True))
+    if present != job_ids:
+        missing = ', '.join(str(job_id) for job_id in sorted(job_ids - present))
+        raise LookupError(f'Job {missing} was deleted during the import')
+    # An applicant already in the pipeline for a job is not added twice
+    existing = set(
+        Application.objects.filter(
+            candidate_id__in={candidate_id for candidate_id, _ in pairs},
+            job_id__in={job_id for _, job_id in pairs},
+        ).values_list('candidate_id', 'job_id')
+    )
+
+    applications = [
+        Application(candidate_id=candidate_id, job_id=job_id, status=clean['status'], coverLetter=clean['coverLetter'])
+        for (candidate_id, job_id), clean in pairs.items()
+        if (candidate_id, job_id) not in existing
+    ]
+    Application.objects.bulk_create(applications, batch_size=1000)
+
+    # bulk_create skips Application.save(), so apply the job counters here
+    deltas = {}
+    for application in applications:
+        job_deltas = deltas.setdefault(application.job_id, Counter())
+        job_deltas.update(Application.counter_deltas(application.status))
+    for job_id, job_deltas in deltas.items():
+        JobOpening.adjust_counters(job_id, job_deltas)
+    return len(applications)
+
+
+def process_chunk(chunk, validators, job_ids):
+    valid, errors = [], []
+    for number, row in chunk:
+        if '__invalid__' in row:
+            errors.append({'row': number, 'errors': {'row': 'Not a JSON object.'}})
+            continue
+        clean, row_errors = validate_row(row, validators, job_ids)
+        if row_errors:
+            errors.append({'row': number, 'email': clean.get('email', ''), 'errors': row_errors})
+        else:
+            valid.append(clean)
+
+    with transaction.atomic():
+        candidate_ids, created, updated, touched = _upsert_candidates(valid) if valid else ({}, 0, 0, [])
+        applications = _create_applications(valid, candidate_ids)
+        if touched:
+            # bulk_create/bulk_update skip the signals that refresh match vectors.
+            # Imported here: api.tasks imports this module
+            from .tasks import refresh_candidates_matches
+            refresh_candidates_matches.delay(touched)
+    return {'created': created, 'updated': updated, 'applications': applications, 'errors': errors}
+
+
+def count_rows(import_job):
+    with import_job.file.open('rb') as f:
+        return sum(1 for _ in iter_rows(f, import_job.format))
+
+
+def run_import(import_id):
+    import_job = ImportJob.objects.filter(pk=import_id).first()
+    if import_job is None or import_job.status in ('DONE', 'FAILED'):
+        return
+    try:
+        _run_import(import_job)
+    except Exception as exc:
+        # Not raised again: a retry could not read the file deleted below
+        logger.exception('Import %s failed', import_id)
+        ImportJob.objects.filter(pk=import_id).update(status='FAILED', message=str(exc)[:500], finished_at=timezone.now())
+    else:
+        ImportJob.objects.filter(pk=import_id).update(status='DONE', finished_at=timezone.now())
+    finally:
+        import_job.file.delete(save=False)
+        ImportJob.objects.filter(pk=import_id).update(file='')
+
+
+def _run_import(import_job):
+    # A run restarted after a lost worker starts over; upserts make reprocessing rows harmless
+    ImportJob.objects.filter(pk=import_job.pk).update(
+        status='RUNNING', total_rows=count_rows(import_job), processed_rows=0,
+        candidates_created=0, candidates_updated=0, applications_created=0, error_count=0, errors=[],
+    )
+
+    validators = compile_validators()
+    job_ids = set(JobOpening.objects.values_list('id', flat=True))
+    totals = Counter()
+    errors = []
+    with import_job.file.open('rb') as f:
+        for chunk in _chunks(iter_rows(f, import_job.format), settings.IMPORT_CHUNK_SIZE):
+            result = process_chunk(chunk, validators, job_ids)
+            totals.update(
+                processed_rows=len(chunk),
+                candidates_created=result['created'],
+                candidates_updated=result['updated'],
+                applications_created=result['applications'],
+                error_count=len(result['errors']),
+            )
+            errors.extend(result['errors'][:max(settings.IMPORT_MAX_ERRORS - len(errors), 0)])
+            ImportJob.objects.filter(pk=import_job.pk).update(errors=errors, **totals)
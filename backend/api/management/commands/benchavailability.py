@@ -0,0 +1,93 @@
+import random
+import time
+from datetime import datetime, time as dt_time, timedelta, timezone as dt_timezone
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api.benchmarks import create_users, latency_summary
+from api.models import Application, Candidate, Interview, InterviewAssignment, JobOpening, Room
+from api.scheduling import find_slots, interviewer_busy
+
+USERNAME_PREFIX = 'bench_avail_'
+PASSWORD = 'bench-password'
+JOB_TITLE = 'Availability benchmark job'
+EMAIL = 'bench-availability@benchmark.invalid'
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks the interview availability search against a calendar of synthetic interviews'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interviewers', type=int, default=2000, help='Number of interviewers to search across')
+        parser.add_argument('--interviews', type=int, default=10, help='Interviews per interviewer in the window')
+        parser.add_argument('--rooms', type=int, default=20, help='Number of rooms')
+        parser.add_argument('--days', type=int, default=14, help='Length of the searched window in days')
+        parser.add_argument('--runs', type=int, default=20, help='Timed runs per measurement')
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        random.seed(options['seed'])
+        self.cleanup()
+        try:
+            started = time.perf_counter()
+            interviewer_ids, room_ids, start, end = self.create_calendar(options)
+            self.stdout.write(f'Seeded {len(interviewer_ids)} interviewers and {len(room_ids)} rooms '
+                              f'in {time.perf_counter() - started:.1f}s')
+
+            panel = interviewer_ids[:3]
+            duration = timedelta(minutes=60)
+            self.measure('interviewer_busy, all interviewers', options['runs'],
+                         lambda: interviewer_busy(interviewer_ids, start, end))
+            self.measure('find_slots, all interviewers', options['runs'],
+                         lambda: find_slots(interviewer_ids, start, end, duration, weekends=True))
+            self.measure('find_slots, panel of 3 with rooms', options['runs'],
+                         lambda: find_slots(panel, start, end, duration, room_ids=room_ids))
+        finally:
+            self.cleanup()
+
+    def cleanup(self):
+        JobOpening.objects.filter(title=JOB_TITLE).delete()
+        Candidate.objects.filter(email=EMAIL).delete()
+        Room.objects.filter(name__startswith=USERNAME_PREFIX).delete()
+        User.objects.filter(username__startswith=USERNAME_PREFIX).delete()
+
+    @transaction.atomic
+    def create_calendar(self, options):
+        users = create_users([f'{USERNAME_PREFIX}{i}' for i in range(options['interviewers'])], PASSWORD)
+        rooms = Room.objects.bulk_create([Room(name=f'{USERNAME_PREFIX}room_{i}') for i in range(options['rooms'])])
+        job = JobOpening.objects.create(title=JOB_TITLE)
+        candidate = Candidate.objects.create(fName='Bench', lName='Availability', email=EMAIL)
+        application = Application.objects.create(candidate=candidate, job=job)
+
+        start = datetime.combine(datetime.now(dt_timezone.utc).date() + timedelta(days=1), dt_time(0), dt_timezone.utc)
+        end = start + timedelta(days=options['days'])
+        interviews, panels = [], []
+        for _ in range(options['interviewers'] * options['interviews'] // 2):
+            # Hour-long interviews in working hours, each with a panel of two
+            begins = start + timedelta(days=random.randrange(options['days']), hours=random.randrange(9, 17))
+            interviews.append(Interview(
+                application=application, start=begins, end=begins + timedelta(hours=1),
+                room=random.choice(rooms) if rooms else None,
+            ))
+            panels.append(random.sample(users, min(2, len(users))))
+        Interview.objects.bulk_create(interviews, batch_size=5000)
+        InterviewAssignment.objects.bulk_create(
+            [
+                InterviewAssignment(interview=interview, interviewer=user, start=interview.start, end=interview.end)
+                for interview, panel in zip(interviews, panels)
+                for user in panel
+            ],
+            batch_size=5000,
+        )
+        return [u.id for u in users], [r.id for r in rooms], start, end
+
+    def measure(self, label, runs, func):
+        func()  # warm up connections and caches
+        ms = []
+        for _ in range(runs):
+            started = time.perf_counter()
+            func()
+            ms.append((time.perf_counter() - started) * 1000)
+        self.stdout.write(self.style.SUCCESS(f'  {label:<36} n={runs:<4} {latency_summary(ms)}'))
@@ -0,0 +1,108 @@
+import logging
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.test.utils import override_settings
+
+from api.benchmarks import create_users, latency_summary
+
+USERNAME_PREFIX = 'bench_login_'
+PASSWORD = 'bench-password'
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks concurrent login latency with and without the login throttles'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=200, help='Number of legitimate users logging in')
+        parser.add_argument('--concurrency', type=int, default=16, help='Number of concurrent client threads')
+        parser.add_argument('--requests', type=int, default=400, help='Login requests per run')
+        parser.add_argument(
+            '--attack-ratio',
+            type=float,
+            default=0.5,
+            help='Share of requests that are credential-stuffing attempts from a few IPs',
+        )
+
+    def handle(self, *args, **options):
+        # 401/429 responses are expected here; keep them out of the output
+        logging.getLogger('django.request').setLevel(logging.ERROR)
+        self.create_users(options['users'])
+        try:
+            for enabled in (False, True):
+                cache.clear()
+                with override_settings(LOGIN_THROTTLE_ENABLED=enabled):
+                    results = self.run(options)
+                self.report('with throttles' if enabled else 'without throttles', results)
+        finally:
+            User.objects.filter(username__startswith=USERNAME_PREFIX).delete()
+
+    def create_users(self, count):
+        User.objects.filter(username__startswith=USERNAME_PREFIX).delete()
+        create_users([f'{USERNAME_PREFIX}{i}' for i in range(count)], PASSWORD)
+
+    def build_plan(self, options):
+        plan = []
+        attack_every = int(1 / options['attack_ratio']) if options['attack_ratio'] > 0 else 0
+        for i in range(options['requests']):
+            if attack_every and i % attack_every == 0:
+                # A handful of attacking IPs replaying a leaked list: mostly
+                # unknown usernames, some real accounts with wrong passwords
+                username = f'{USERNAME_PREFIX}{i % options["users"]}' if i % 4 == 0 else f'leaked_{i}'
+                plan.append(('attack', f'10.66.0.{i % 4}', username, f'guess-{i}'))
+            else:
+                plan.append(('user', f'10.0.{i // 250 % 250}.{i % 250}', f'{USERNAME_PREFIX}{i % options["users"]}', PASSWORD))
+        return plan
+
+    def run(self, options):
+        plan = self.build_plan(options)
+        lock = threading.Lock()
+        results = {'latency': {'user': [], 'attack': []}, 'status': {}, 'elapsed': 0.0}
+
+        def worker(chunk):
+            client = Client()
+            try:
+                for kind, ip, username, password in chunk:
+                    started = time.perf_counter()
+                    response = client.post(
+                        '/api/auth/login/',
+                        {'username': username, 'password': password},
+                        content_type='application/json',
+                        REMOTE_ADDR=ip,
+                    )
+                    elapsed = time.perf_counter() - started
+                    with lock:
+                        results['latency'][kind].append(elapsed)
+                        key = (kind, response.status_code)
+                        results['status'][key] = results['status'].get(key, 0) + 1
+            finally:
+                connection.close()
+
+        concurrency = options['concurrency']
+        chunks = [plan[i::concurrency] for i in range(concurrency)]
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(worker, chunks))
+        results['elapsed'] = time.perf_counter() - started
+        return results
+
+    def report(self, label, results):
+        total = sum(len(v) for v in results['latency'].values())
+        self.stdout.write(self.style.SUCCESS(f'\n{label}: {total} requests in {results["elapsed"]:.2f}s '
+                                             f'({total / results["elapsed"]:.1f} req/s)'))
+        for kind, latencies in results['latency'].items():
+            if not latencies:
+                continue
+            ms = [v * 1000 for v in latencies]
+            self.stdout.write(
+                f'  {kind:<6} n={len(ms):<5} {latency_summary(ms)} mean={statistics.mean(ms):7.1f}ms'
+            )
+        for (kind, code), count in sorted(results['status'].items()):
+            self.stdout.write(f'  {kind:<6} HTTP {code}: {count}')
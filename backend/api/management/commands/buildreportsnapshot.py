@@ -0,0 +1,34 @@
+import time
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from api.reports import build_snapshot
+
+class Command(BaseCommand):
+    help = 'Writes a columnar snapshot of applications and jobs for the reporting API'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--every',
+            type=float,
+            default=None,
+            help='Keep running and rebuild the snapshot every this many seconds',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            started = time.monotonic()
+            try:
+                path = build_snapshot()
+            except Exception as exc:
+                if not options['every']:
+                    raise
+                # Keep serving the previous snapshot and try again next round
+                self.stderr.write(self.style.ERROR(f'Snapshot failed: {exc}'))
+            else:
+                self.stdout.write(self.style.SUCCESS(
+                    f'Wrote report snapshot {path} in {time.monotonic() - started:.1f}s.'
+                ))
+            if not options['every']:
+                break
+            close_old_connections()
+            time.sleep(max(options['every'] - (time.monotonic() - started), 0))
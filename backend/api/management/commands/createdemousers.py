@@ -1,6 +1,6 @@
 from django.core.management.base import BaseCommand
 from django.contrib.auth.models import User
-from api.models import UserProfile, Candidate
+from api.models import UserProfile, Candidate, DepartmentAssignment
 
 class Command(BaseCommand):
     help = 'Creates demo users for testing'
@@ -30,6 +30,9 @@ class Command(BaseCommand):
             manager_user.save()
             manager_user.profile.role = 'MANAGER'
             manager_user.profile.save()
+            # Managers only see applications for their departments
+            for department in ['Computer Science', 'Data Science', 'DevOps', 'Cybersecurity']:
+                DepartmentAssignment.objects.get_or_create(profile=manager_user.profile, department=department)
             self.stdout.write(self.style.SUCCESS('Created Manager user: manager / manager123'))
         else:
             self.stdout.write(self.style.WARNING('Manager user already exists'))
@@ -0,0 +1,27 @@
+import time
+from django.core.management.base import BaseCommand
+from api.dedupe import rebuild_duplicate_pairs
+
+class Command(BaseCommand):
+    help = 'Finds likely duplicate candidates and stores them for review (replaces pending pairs)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--min-score',
+            type=float,
+            default=None,
+            help='Lowest pair score to report (default: DEDUPE_MIN_SCORE)',
+        )
+        parser.add_argument(
+            '--max-bucket',
+            type=int,
+            default=None,
+            help='Skip blocking buckets with more candidates than this (default: DEDUPE_MAX_BUCKET)',
+        )
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        found = rebuild_duplicate_pairs(min_score=options['min_score'], max_bucket=options['max_bucket'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Found {found} likely duplicate pairs in {time.monotonic() - started:.1f}s.'
+        ))
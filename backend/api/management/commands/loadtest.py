@@ -0,0 +1,364 @@
+import asyncio
+import json
+import logging
+import random
+import time
+from collections import Counter, defaultdict
+from http.cookies import SimpleCookie
+from urllib.parse import urlsplit
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from api.benchmarks import create_users, latency_summary
+from api.models import Candidate, JobOpening
+
+USERNAME_PREFIX = 'load_'
+EMAIL_DOMAIN = 'loadtest.invalid'
+PASSWORD = 'load-password'
+JOB_TITLE_PREFIX = 'Load test job'
+DEPARTMENTS = ['Computer Science', 'Data Science', 'Mathematics', 'Engineering']
+
+# The requests each frontend screen fires together (see components/dashboards)
+CANDIDATE_POLL = [
+    '/api/applications/',
+    '/api/jobs/',
+    '/api/notifications/',
+    '/api/candidates/my_profile/',
+    '/api/notifications/unread_count/',
+]
+HR_DASHBOARD = ['/api/candidates/', '/api/jobs/', '/api/applications/']
+# Browsers open about this many connections per host
+CONNECTIONS_PER_USER = 6
+
+
+class Stats:
+    """Latency, status and X-DB-Queries totals per request label."""
+
+    def __init__(self):
+        self.latency = defaultdict(list)
+        self.status = defaultdict(Counter)
+        self.errors = Counter()
+        self.queries = Counter()
+        self.counted = Counter()
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+
+    def record(self, label, status, elapsed, queries):
+        self.latency[label].append(elapsed)
+        self.status[label][status] += 1
+        if queries is not None:
+            self.queries[label] += queries
+            self.counted[label] += 1
+
+    def error(self, label, exc):
+        self.errors[(label, type(exc).__name__)] += 1
+
+    def stop(self):
+        self.elapsed = time.perf_counter() - self.started
+
+
+class Connection:
+    """One keep-alive HTTP/1.1 connection; just enough of the protocol for the API."""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = self.writer = None
+
+    async def open(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        return self
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+    async def request(self, method, path, headers, body):
+        lines = [f'{method} {path} HTTP/1.1', f'Host: {self.host}:{self.port}']
+        lines += [f'{name}: {value}' for name, value in headers.items()]
+        lines += [f'Content-Length: {len(body)}', '', '']
+        self.writer.write('\r\n'.join(lines).encode('latin-1') + body)
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionResetError('Server closed the connection')
+        status = int(status_line.split()[1])
+        response_headers = []
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            response_headers.append((name.strip().lower(), value.strip()))
+        fields = dict(response_headers)
+
+        keep_alive = fields.get('connection', '').lower() != 'close'
+        if fields.get('transfer-encoding', '').lower() == 'chunked':
+            body = b''
+            while True:
+                size = int((await self.reader.readline()).split(b';')[0], 16)
+                chunk = await self.reader.readexactly(size + 2)
+                if not size:
+                    break
+                body += chunk[:-2]
+        elif 'content-length' in fields:
+            body = await self.reader.readexactly(int(fields['content-length']))
+        elif status in (204, 304):
+            body = b''
+        else:
+            body = await self.reader.read()
+            keep_alive = False
+        return status, response_headers, body, keep_alive
+
+
+class Session:
+    """A browser stand-in: shared cookies, a few parallel keep-alive connections."""
+
+    def __init__(self, host, port, stats, timeout):
+        self.host = host
+        self.port = port
+        self.stats = stats
+        self.timeout = timeout
+        self.cookies = {}
+        self.idle = []
+        self.slots = asyncio.Semaphore(CONNECTIONS_PER_USER)
+
+    def headers(self, method):
+        headers = {'Accept': 'application/json', 'Content-Type': 'application/json'}
+        if self.cookies:
+            headers['Cookie'] = '; '.join(f'{name}={value}' for name, value in self.cookies.items())
+        if method not in ('GET', 'HEAD') and 'csrftoken' in self.cookies:
+            # Django's CSRF check for session-authenticated writes
+            headers['X-CSRFToken'] = self.cookies['csrftoken']
+        return headers
+
+    def store_cookies(self, response_headers):
+        for name, value in response_headers:
+            if name != 'set-cookie':
+                continue
+            cookie = SimpleCookie()
+            cookie.load(value)
+            for key, morsel in cookie.items():
+                if morsel.value and morsel['max-age'] != '0':
+                    self.cookies[key] = morsel.value
+                else:
+                    self.cookies.pop(key, None)
+
+    async def send(self, method, path, body):
+        connection = self.idle.pop() if self.idle else None
+        reused = connection is not None
+        if connection is None:
+            connection = await Connection(self.host, self.port).open()
+        try:
+            result = await connection.request(method, path, self.headers(method), body)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            connection.close()
+            if not reused:
+                raise
+            # The server dropped an idle keep-alive connection; retry once on a new one
+            connection = await Connection(self.host, self.port).open()
+            result = await connection.request(method, path, self.headers(method), body)
+        except BaseException:
+            connection.close()
+            raise
+        if result[3]:
+            self.idle.append(connection)
+        else:
+            connection.close()
+        return result
+
+    async def request(self, method, path, data=None, label=None):
+        label = label or f'{method} {path}'
+        body = json.dumps(data).encode() if data is not None else b''
+        async with self.slots:
+            started = time.perf_counter()
+            try:
+                status, headers, content, _ = await asyncio.wait_for(self.send(method, path, body), self.timeout)
+            except (OSError, asyncio.IncompleteReadError, ValueError) as exc:
+                self.stats.error(label, exc)
+                return None, {}, b''
+            elapsed = time.perf_counter() - started
+        self.store_cookies(headers)
+        headers = dict(headers)
+        queries = headers.get('x-db-queries')
+        self.stats.record(label, status, elapsed, int(queries) if queries else None)
+        return status, headers, content
+
+    def close(self):
+        for connection in self.idle:
+            connection.close()
+        self.idle = []
+
+
+class Command(BaseCommand):
+    help = (
+        'Replays the frontend dashboards\' traffic against a running server '
+        '(runserver or an ASGI server) using synthetic users. Run it against the '
+        'same database the server uses; synthetic data is removed afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000', help='Base URL of the running server')
+        parser.add_argument('--candidates', type=int, default=50, help='Candidates polling their dashboard')
+        parser.add_argument('--hr', type=int, default=5, help='HR users reloading the HR dashboard')
+        parser.add_argument('--posters', type=int, default=1, help='HR users posting bursts of jobs')
+        parser.add_argument('--duration', type=float, default=60, help='Seconds to replay traffic for')
+        parser.add_argument('--poll-interval', type=float, default=30, help='Candidate dashboard poll interval in seconds')
+        parser.add_argument('--hr-interval', type=float, default=30, help='Seconds between HR dashboard reloads')
+        parser.add_argument('--burst-size', type=int, default=5, help='Jobs posted at once in each burst')
+        parser.add_argument('--burst-interval', type=float, default=20, help='Seconds between job-post bursts')
+        parser.add_argument('--timeout', type=float, default=30, help='Per-request timeout in seconds')
+        parser.add_argument('--keep', action='store_true', help='Keep the synthetic users and jobs afterwards')
+
+    def handle(self, *args, **options):
+        url = urlsplit(options['url'])
+        if url.scheme != 'http' or not url.hostname:
+            raise CommandError('--url must be a plain http:// URL, e.g. http://127.0.0.1:8000')
+        self.host, self.port = url.hostname, url.port or 80
+        # Error responses are part of the report, not log noise
+        logging.getLogger('asyncio').setLevel(logging.CRITICAL)
+
+        self.cleanup()
+        users = self.create_users(options)
+        try:
+            login_stats, stats = asyncio.run(self.run(users, options))
+        finally:
+            if not options['keep']:
+                self.cleanup()
+        self.report('Login', login_stats)
+        self.report('Replay', stats)
+
+    def cleanup(self):
+        JobOpening.objects.filter(title__startswith=JOB_TITLE_PREFIX).delete()
+        Candidate.objects.filter(email__endswith=f'@{EMAIL_DOMAIN}').delete()
+        User.objects.filter(username__startswith=USERNAME_PREFIX).delete()
+
+    @transaction.atomic
+    def create_users(self, options):
+        users = {}
+        for role, count in (('candidate', options['candidates']), ('hr', options['hr']), ('poster', options['posters'])):
+            users[role] = []
+            for i, user in enumerate(create_users([f'{USERNAME_PREFIX}{role}_{i}' for i in range(count)], PASSWORD)):
+                profile = user.profile
+                if role == 'candidate':
+                    profile.candidate = Candidate.objects.create(
+                        fName='Load', lName=f'Candidate {i}', email=f'{user.username}@{EMAIL_DOMAIN}',
+                    )
+                else:
+                    profile.role = 'HR'
+                profile.save()
+                users[role].append(user.username)
+        return users
+
+    async def run(self, users, options):
+        probe = Connection(self.host, self.port)
+        try:
+            await probe.open()
+        except OSError as exc:
+            raise CommandError(f'Cannot reach {options["url"]}: {exc}')
+        probe.close()
+
+        login_stats = Stats()
+        logins = asyncio.Semaphore(10)
+        sessions = {}
+
+        async def log_in(role, username):
+            session = Session(self.host, self.port, login_stats, options['timeout'])
+            async with logins:
+                for _ in range(5):
+                    status, headers, _ = await session.request(
+                        'POST', '/api/auth/login/', {'username': username, 'password': PASSWORD},
+                    )
+                    if status != 429:
+                        break
+                    # Throttled; start the server with LOGIN_THROTTLE_ENABLED=false to avoid the wait
+                    await asyncio.sleep(min(float(headers.get('retry-after', 5)), 60))
+            if status == 200:
+                sessions.setdefault(role, []).append(session)
+
+        await asyncio.gather(*(log_in(role, username) for role, names in users.items() for username in names))
+        login_stats.stop()
+        if not sessions:
+            raise CommandError('No synthetic user could log in; see the login report above')
+
+        stats = Stats()
+        for role_sessions in sessions.values():
+            for session in role_sessions:
+                session.stats = stats
+        stop_at = time.monotonic() + options['duration']
+
+        async def repeat(session, paths, interval):
+            # Real users are spread across the poll cycle, not in lockstep
+            await asyncio.sleep(random.uniform(0, min(interval, options['duration'])))
+            while time.monotonic() < stop_at:
+                await asyncio.gather(*(session.request('GET', path) for path in paths))
+                await asyncio.sleep(max(min(interval, stop_at - time.monotonic()), 0))
+
+        async def post_jobs(session):
+            posted = 0
+            while time.monotonic() < stop_at:
+                await asyncio.gather(*(
+                    session.request('POST', '/api/jobs/', {
+                        'title': f'{JOB_TITLE_PREFIX} {id(session)}-{posted + n}',
+                        'description': 'Synthetic job posted by the load test.',
+                        'positions': 1,
+                        'department': random.choice(DEPARTMENTS),
+                    })
+                    for n in range(options['burst_size'])
+                ))
+                posted += options['burst_size']
+                await asyncio.sleep(max(min(options['burst_interval'], stop_at - time.monotonic()), 0))
+
+        scenarios = [repeat(s, CANDIDATE_POLL, options['poll_interval']) for s in sessions.get('candidate', [])]
+        scenarios += [repeat(s, HR_DASHBOARD, options['hr_interval']) for s in sessions.get('hr', [])]
+        scenarios += [post_jobs(s) for s in sessions.get('poster', [])]
+        try:
+            await asyncio.gather(*scenarios)
+        finally:
+            stats.stop()
+            for role_sessions in sessions.values():
+                for session in role_sessions:
+                    session.close()
+        return login_stats, stats
+
+    def report(self, label, stats):
+        total = sum(len(v) for v in stats.latency.values())
+        errors = sum(stats.errors.values())
+        failed = sum(count for codes in stats.status.values() for code, count in codes.items() if code >= 400)
+        attempts = total + errors
+        elapsed = stats.elapsed or 1e-9
+        self.stdout.write(self.style.SUCCESS(
+            f'\n{label}: {total} responses in {elapsed:.2f}s ({total / elapsed:.1f} req/s), '
+            f'error rate {100 * (failed + errors) / attempts if attempts else 0:.2f}%'
+        ))
+
+        all_ms = []
+        for name in sorted(stats.latency):
+            ms = [v * 1000 for v in stats.latency[name]]
+            all_ms += ms
+            queries = (
+                f'queries/req={stats.queries[name] / stats.counted[name]:6.1f}' if stats.counted[name] else 'queries/req=   n/a'
+            )
+            self.stdout.write(
+                f'  {name:<40} n={len(ms):<6} {latency_summary(ms)} max={max(ms):7.1f}ms {queries}'
+            )
+        if all_ms:
+            self.stdout.write(
+                f'  {"all":<40} n={len(all_ms):<6} {latency_summary(all_ms)} max={max(all_ms):7.1f}ms'
+            )
+
+        for name in sorted(stats.status):
+            for code, count in sorted(stats.status[name].items()):
+                if code >= 400:
+                    self.stdout.write(self.style.WARNING(f'  {name}: HTTP {code} x{count}'))
+        for (name, error), count in sorted(stats.errors.items()):
+            self.stdout.write(self.style.ERROR(f'  {name}: {error} x{count}'))
+
+        if sum(stats.counted.values()):
+            self.stdout.write(f'  DB queries: {sum(stats.queries.values())} total')
+        else:
+            self.stdout.write(self.style.WARNING('  DB queries: n/a (start the server with QUERY_COUNT_HEADER=true)'))
@@ -0,0 +1,49 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from api.retention import (
+    partitioning_supported, is_partitioned, convert_to_partitioned, ensure_partitions, detach_expired_partitions
+)
+
+class Command(BaseCommand):
+    help = 'Manages monthly range partitions of the notification table (PostgreSQL only)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--convert',
+            action='store_true',
+            help='Rebuild the notification table as a partitioned table (one-time, locks the table)',
+        )
+        parser.add_argument(
+            '--months-ahead',
+            type=int,
+            default=settings.NOTIFICATION_PARTITION_MONTHS_AHEAD,
+            help='Number of future monthly partitions to keep created',
+        )
+        parser.add_argument(
+            '--retention-months',
+            type=int,
+            default=settings.NOTIFICATION_PARTITION_RETENTION_MONTHS,
+            help='Detach partitions older than this many months',
+        )
+        parser.add_argument(
+            '--drop',
+            action='store_true',
+            help='Drop expired partitions after detaching them instead of keeping them for archiving',
+        )
+
+    def handle(self, *args, **options):
+        if not partitioning_supported():
+            raise CommandError('Notification partitioning requires PostgreSQL.')
+
+        if options['convert']:
+            if convert_to_partitioned(options['months_ahead']):
+                self.stdout.write(self.style.SUCCESS('Notification table converted to monthly partitions.'))
+            else:
+                self.stdout.write(self.style.WARNING('Notification table is already partitioned.'))
+        elif not is_partitioned():
+            raise CommandError('Notification table is not partitioned. Run with --convert first.')
+
+        for name in ensure_partitions(options['months_ahead']):
+            self.stdout.write(self.style.SUCCESS(f'Created partition {name}'))
+        for name in detach_expired_partitions(options['retention_months'], drop=options['drop']):
+            self.stdout.write(self.style.WARNING(f'Detached partition {name}'))
@@ -0,0 +1,51 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from api.retention import prune_read_notifications, is_partitioned, maintain_partitions
+
+class Command(BaseCommand):
+    help = 'Deletes read notifications older than the retention period in small batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=settings.NOTIFICATION_RETENTION_DAYS,
+            help='Delete read notifications older than this many days',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.NOTIFICATION_PRUNE_BATCH_SIZE,
+            help='Rows deleted per transaction',
+        )
+        parser.add_argument(
+            '--pause',
+            type=float,
+            default=0.0,
+            help='Seconds to sleep between batches to limit load on the database',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report how many notifications would be deleted',
+        )
+
+    def handle(self, *args, **options):
+        count = prune_read_notifications(
+            days=options['days'],
+            batch_size=options['batch_size'],
+            pause=options['pause'],
+            dry_run=options['dry_run'],
+        )
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING(f'{count} read notifications older than {options["days"]} days would be deleted.'))
+            return
+        self.stdout.write(self.style.SUCCESS(f'Deleted {count} read notifications older than {options["days"]} days.'))
+
+        # Keep monthly partitions rolling when the table has been partitioned
+        if is_partitioned():
+            created, detached = maintain_partitions()
+            for name in created:
+                self.stdout.write(self.style.SUCCESS(f'Created partition {name}'))
+            for name in detached:
+                self.stdout.write(self.style.WARNING(f'Detached partition {name}'))
@@ -0,0 +1,27 @@
+import time
+from django.core.management.base import BaseCommand
+from api.matching import rebuild_recommendations
+from api.models import Recommendation
+
+class Command(BaseCommand):
+    help = 'Recomputes all candidate/job recommendations from the stored match vectors'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--revectorize',
+            action='store_true',
+            help='Recompute every candidate and job vector from its text first',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=None,
+            help='Candidates scored per matrix product',
+        )
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        rebuild_recommendations(chunk_size=options['chunk_size'], revectorize=options['revectorize'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Stored {Recommendation.objects.count()} recommendations in {time.monotonic() - started:.1f}s.'
+        ))
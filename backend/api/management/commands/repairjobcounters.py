@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from api.counters import recount_job_counters
+
+class Command(BaseCommand):
+    help = 'Recomputes the denormalized application counters on job openings'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--job',
+            type=int,
+            action='append',
+            dest='jobs',
+            help='Only repair this job id (can be given several times)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Jobs locked and recounted per transaction',
+        )
+
+    def handle(self, *args, **options):
+        repaired = recount_job_counters(options['jobs'], batch_size=options['batch_size'])
+        if repaired:
+            self.stdout.write(self.style.WARNING(f'Repaired counters on {repaired} job openings.'))
+        else:
+            self.stdout.write(self.style.SUCCESS('All job counters are correct.'))
@@ -0,0 +1,51 @@
+import signal
+from django.core.management.base import BaseCommand
+from api.queue import Worker, autodiscover
+
+class Command(BaseCommand):
+    help = 'Runs a background worker that processes queued tasks'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=2,
+            help='Number of worker threads',
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=1.0,
+            help='Seconds to wait when the queue is empty',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1,
+            help='Tasks claimed per poll by each thread',
+        )
+        parser.add_argument(
+            '--burst',
+            action='store_true',
+            help='Exit once the queue is empty instead of polling forever',
+        )
+
+    def handle(self, *args, **options):
+        autodiscover()
+        worker = Worker(
+            concurrency=options['concurrency'],
+            poll_interval=options['poll_interval'],
+            batch_size=options['batch_size'],
+            burst=options['burst'],
+        )
+
+        def shutdown(signum, frame):
+            self.stdout.write(self.style.WARNING('Stopping worker after current tasks...'))
+            worker.stop()
+
+        signal.signal(signal.SIGINT, shutdown)
+        signal.signal(signal.SIGTERM, shutdown)
+
+        self.stdout.write(self.style.SUCCESS(f'Worker {worker.worker_id} started with {options["concurrency"]} threads'))
+        worker.run()
+        self.stdout.write(self.style.SUCCESS('Worker stopped.'))
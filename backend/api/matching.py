@@ -0,0 +1,470 @@
+"""
+Candidate/job matching on hashed TF-IDF vectors.
+
+Every candidate and job has a stored term vector (hashed term ids plus
+sublinear term frequencies). Scoring applies IDF weights computed from the
+job corpus and L2-normalizes, so a score is the cosine similarity of the
+two TF-IDF vectors. The top MATCHING_TOP_K pairs per candidate and per job
+are kept in the Recommendation table, where reads are a single index scan.
+
+Saving a candidate or job refreshes only that row's vector and its pairs
+(refresh_candidate / refresh_job). Those incremental refreshes keep each
+side's threshold, the score of its k-th best match, to decide whether the
+changed row also enters the other side's lists. They score the changed row
+against a per-process JobIndex and CandidateCache that are only reloaded
+when the stored vectors change. rebuild_recommendations() recomputes every
+pair exactly in batched sparse matrix products.
+"""
+import hashlib
+import re
+import threading
+import zlib
+from datetime import timedelta
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max
+from django.utils import timezone
+from scipy import sparse
+
+from .models import Candidate, CandidateVector, JobOpening, JobVector, Recommendation
+
+N_FEATURES = 2 ** 20
+TOKEN_RE = re.compile(r'[a-z0-9][a-z0-9+#]*')
+STOP_WORDS = frozenset(
+    'a an and are as at be by for from has have in is it its of on or our that the their this to we will with '
+    'you your'.split()
+)
+WRITE_BATCH_SIZE = 5000
+
+
+# --- Vectors ---------------------------------------------------------------
+
+def vectorize(text):
+    """Return (term ids, weights) for `text`: hashed tokens with 1 + log(tf) weights."""
+    counts = {}
+    for token in TOKEN_RE.findall(text.lower()):
+        if token not in STOP_WORDS and len(token) > 1:
+            term = zlib.crc32(token.encode()) & (N_FEATURES - 1)
+            counts[term] = counts.get(term, 0) + 1
+    terms = np.fromiter(counts.keys(), dtype=np.int32, count=len(counts))
+    weights = 1 + np.log(np.fromiter(counts.values(), dtype=np.float32, count=len(counts)))
+    order = np.argsort(terms)
+    return terms[order], weights[order].astype(np.float32)
+
+
+def candidate_text(candidate):
+    parts = [candidate.bio]
+    if candidate.resume_file_id:
+        parts.append(candidate.resume_file.text)
+    return '\n'.join(p for p in parts if p)
+
+
+def job_text(job):
+    # Titles are short but the most telling part, so they count twice
+    return '\n'.join([job.title, job.title, job.department, job.description])
+
+
+def _text_hash(text):
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def _vector_fields(text):
+    terms, weights = vectorize(text)
+    return {'terms': terms.tobytes(), 'weights': weights.tobytes(), 'text_hash': _text_hash(text)}
+
+
+def _matrix(rows):
+    """Build a CSR matrix from an iterable of (terms bytes, weights bytes)."""
+    indptr, indices, data = [0], [], []
+    for terms, weights in rows:
+        terms = np.frombuffer(terms, dtype=np.int32)
+        indices.append(terms)
+        data.append(np.frombuffer(weights, dtype=np.float32))
+        indptr.append(indptr[-1] + len(terms))
+    indices = np.concatenate(indices) if indices else np.empty(0, dtype=np.int32)
+    data = np.concatenate(data) if data else np.empty(0, dtype=np.float32)
+    return sparse.csr_matrix((data, indices, np.array(indptr)), shape=(len(indptr) - 1, N_FEATURES))
+
+
+def _weigh(matrix, idf):
+    """Apply IDF weights and L2-normalize the rows."""
+    weighted = sparse.csr_matrix(matrix.multiply(idf.reshape(1, -1)), dtype=np.float32)
+    norms = np.sqrt(np.asarray(weighted.multiply(weighted).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    return sparse.diags((1 / norms).astype(np.float32)) @ weighted
+
+
+def _job_stamp():
+    """Changes whenever a job vector is added, changed or removed."""
+    stamp = JobVector.objects.aggregate(count=Count('pk'), updated=Max('updated_at'))
+    return stamp['count'], stamp['updated']
+
+
+class JobIndex:
+    """All job vectors as one normalized TF-IDF matrix, plus the corpus IDF."""
+
+    def __init__(self):
+        self.stamp = _job_stamp()
+        rows = list(JobVector.objects.order_by('job_id').values_list('job_id', 'terms', 'weights'))
+        self.ids = np.array([r[0] for r in rows], dtype=np.int64)
+        raw = _matrix((bytes(r[1]), bytes(r[2])) for r in rows)
+        df = np.bincount(raw.indices, minlength=N_FEATURES)
+        self.idf = (np.log((1 + len(rows)) / (1 + df)) + 1).astype(np.float32)
+        self.matrix = _weigh(raw, self.idf)
+
+    def weigh(self, matrix):
+        return _weigh(matrix, self.idf)
+
+    def thresholds(self):
+        """Current thresholds of the indexed jobs, read fresh as refreshes move them without touching the index."""
+        current = dict(JobVector.objects.values_list('job_id', 'threshold'))
+        return np.array([current.get(i, np.inf) for i in self.ids.tolist()], dtype=np.float32)
+
+
+_job_index = None
+_job_index_lock = threading.Lock()
+
+
+def job_index():
+    """The shared JobIndex, rebuilt only once the job vectors have changed."""
+    global _job_index
+    stamp = _job_stamp()
+    with _job_index_lock:
+        if _job_index is None or _job_index.stamp != stamp:
+            _job_index = JobIndex()
+        return _job_index
+
+
+class CandidateCache:
+    """
+    Raw candidate vectors kept in memory so refresh_job does not read every
+    vector from the database again.
+
+    Each use re-reads the rows updated since the previous one. The window
+    overlaps by SYNC_OVERLAP to pick up transactions that committed late and
+    clocks that differ between servers. A row count that no longer matches
+    means rows were deleted and the cache is reloaded. With more than
+    MATCHING_CANDIDATE_CACHE_SIZE vectors the cache is not used.
+    """
+    SYNC_OVERLAP = timedelta(minutes=5)
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        self.rows = {}
+        self.synced_at = None
+        self.built = None
+
+    def matrix(self):
+        """(candidate ids, raw matrix) of every candidate vector, or None when there are too many to cache."""
+        with self.lock:
+            count = CandidateVector.objects.count()
+            if count > settings.MATCHING_CANDIDATE_CACHE_SIZE:
+                self.clear()
+                return None
+            started = timezone.now()
+            changed = CandidateVector.objects.all()
+            if self.synced_at is not None:
+                changed = changed.filter(updated_at__gte=self.synced_at - self.SYNC_OVERLAP)
+            self._load(changed)
+            if len(self.rows) != count:
+                self.clear()
+                self._load(CandidateVector.objects.all())
+            self.synced_at = started
+            if self.built is None:
+                ids = np.fromiter(self.rows.keys(), dtype=np.int64, count=len(self.rows))
+                self.built = ids, _matrix(self.rows.values())
+            return self.built
+
+    def discard(self, candidate_ids):
+        with self.lock:
+            for candidate_id in candidate_ids:
+                if self.rows.pop(candidate_id, None) is not None:
+                    self.built = None
+
+    def _load(self, queryset):
+        rows = queryset.values_list('candidate_id', 'terms', 'weights').iterator(chunk_size=settings.MATCHING_CHUNK_SIZE)
+        for candidate_id, terms, weights in rows:
+            self.rows[candidate_id] = (bytes(terms), bytes(weights))
+            self.built = None
+
+
+candidate_cache = CandidateCache()
+
+
+def _candidate_vector_chunks(chunk_size):
+    """Yield (candidate ids, raw matrix, thresholds) for all candidate vectors, chunk by chunk."""
+    rows = CandidateVector.objects.order_by('candidate_id').values_list(
+        'candidate_id', 'terms', 'weights', 'threshold'
+    ).iterator(chunk_size=chunk_size)
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            yield _unpack_chunk(chunk)
+            chunk = []
+    if chunk:
+        yield _unpack_chunk(chunk)
+
+
+def _unpack_chunk(chunk):
+    ids = np.array([r[0] for r in chunk], dtype=np.int64)
+    thresholds = np.array([r[3] for r in chunk], dtype=np.float32)
+    return ids, _matrix((bytes(r[1]), bytes(r[2])) for r in chunk), thresholds
+
+
+def _candidate_thresholds(ids):
+    """Current thresholds of `ids`, NaN for candidates that no longer have a vector."""
+    current = {}
+    for start in range(0, len(ids), WRITE_BATCH_SIZE):
+        batch = ids[start:start + WRITE_BATCH_SIZE].tolist()
+        current.update(CandidateVector.objects.filter(candidate_id__in=batch).values_list('candidate_id', 'threshold'))
+    return np.array([current.get(i, np.nan) for i in ids.tolist()], dtype=np.float32)
+
+
+def _score_candidates(row, index):
+    """(candidate ids, scores, thresholds) of the candidates scoring above MATCHING_MIN_SCORE against `row`."""
+    min_score = settings.MATCHING_MIN_SCORE
+    cached = candidate_cache.matrix()
+    if cached is not None:
+        ids, raw = cached
+        scores = (index.weigh(raw) @ row.T).toarray().ravel()
+        hit = scores > min_score
+        ids, scores = ids[hit], scores[hit]
+        thresholds = _candidate_thresholds(ids)
+        gone = np.isnan(thresholds)
+        candidate_cache.discard(ids[gone].tolist())
+        return ids[~gone], scores[~gone], thresholds[~gone]
+
+    parts = []
+    for ids, raw, thresholds in _candidate_vector_chunks(settings.MATCHING_CHUNK_SIZE):
+        scores = (index.weigh(raw) @ row.T).toarray().ravel()
+        hit = scores > min_score
+        parts.append((ids[hit], scores[hit], thresholds[hit]))
+    if not parts:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32), np.empty(0, dtype=np.float32)
+    return tuple(np.concatenate(p) for p in zip(*parts))
+
+
+def _top_k(scores, k, min_score):
+    """Indices of the k best scores above min_score, best first."""
+    candidates = np.flatnonzero(scores > min_score)
+    if len(candidates) > k:
+        candidates = candidates[np.argpartition(scores[candidates], -k)[-k:]]
+    return candidates[np.argsort(-scores[candidates], kind='stable')]
+
+
+def _kth_score(scores, k):
+    return float(scores[k - 1]) if len(scores) >= k else 0.0
+
+
+def _replace_pairs(existing, pairs):
+    """
+    Make the rows of `existing` exactly `pairs` ({(candidate id, job id):
+    score}): upsert the pairs, then delete the rows not among them. Run it
+    inside a transaction so readers see either the old or the new rows.
+    """
+    Recommendation.objects.bulk_create(
+        [Recommendation(candidate_id=c, job_id=j, score=score) for (c, j), score in pairs.items()],
+        batch_size=WRITE_BATCH_SIZE,
+        update_conflicts=True, unique_fields=['candidate', 'job'], update_fields=['score'],
+    )
+    stale = [pk for pk, c, j in existing.values_list('pk', 'candidate_id', 'job_id').iterator() if (c, j) not in pairs]
+    for start in range(0, len(stale), WRITE_BATCH_SIZE):
+        Recommendation.objects.filter(pk__in=stale[start:start + WRITE_BATCH_SIZE]).delete()
+
+
+# --- Incremental refresh ---------------------------------------------------
+
+def refresh_candidate(candidate_id, force=False):
+    """Re-vectorize one candidate and recompute the pairs it takes part in."""
+    candidate = Candidate.objects.select_related('resume_file').filter(pk=candidate_id).first()
+    if candidate is None:
+        return
+    fields = _vector_fields(candidate_text(candidate))
+    vector = CandidateVector.objects.filter(candidate_id=candidate_id).first()
+    if vector is not None and vector.text_hash == fields['text_hash'] and not force:
+        return
+
+    k, min_score = settings.MATCHING_TOP_K, settings.MATCHING_MIN_SCORE
+    index = job_index()
+    if len(index.ids):
+        row = index.weigh(_matrix([(fields['terms'], fields['weights'])]))
+        scores = (index.matrix @ row.T).toarray().ravel()
+    else:
+        scores = np.empty(0, dtype=np.float32)
+
+    best = _top_k(scores, k, min_score)
+    # The candidate may also displace a job's current k-th best candidate
+    selected = np.union1d(best, np.flatnonzero((scores > min_score) & (scores >= index.thresholds())))
+    pairs = {(candidate_id, int(index.ids[i])): float(scores[i]) for i in selected}
+
+    with transaction.atomic():
+        CandidateVector.objects.update_or_create(
+            candidate_id=candidate_id,
+            defaults={**fields, 'threshold': _kth_score(scores[best], k)},
+        )
+        _replace_pairs(Recommendation.objects.filter(candidate_id=candidate_id), pairs)
+
+
+def refresh_job(job_id, force=False):
+    """Re-vectorize one job and recompute the pairs it takes part in."""
+    job = JobOpening.objects.filter(pk=job_id).first()
+    if job is None:
+        return
+    fields = _vector_fields(job_text(job))
+    vector = JobVector.objects.filter(job_id=job_id).first()
+    if vector is not None and vector.text_hash == fields['text_hash'] and not force:
+        return
+    JobVector.objects.update_or_create(job_id=job_id, defaults=fields)
+
+    k, min_score = settings.MATCHING_TOP_K, settings.MATCHING_MIN_SCORE
+    index = job_index()
+    row = index.weigh(_matrix([(fields['terms'], fields['weights'])]))
+    ids, scores, thresholds = _score_candidates(row, index)
+
+    best = _top_k(scores, k, min_score)
+    # Candidates for whom this job beats their current k-th best job
+    selected = np.union1d(best, np.flatnonzero(scores >= thresholds))
+    pairs = {(int(ids[i]), job_id): float(scores[i]) for i in selected}
+
+    with transaction.atomic():
+        JobVector.objects.filter(job_id=job_id).update(threshold=_kth_score(scores[best], k))
+        _replace_pairs(Recommendation.objects.filter(job_id=job_id), pairs)
+
+
+# --- Full rebuild ----------------------------------------------------------
+
+def vectorize_all(chunk_size=None):
+    """(Re)compute the stored vectors of every candidate and job."""
+    chunk_size = chunk_size or settings.MATCHING_CHUNK_SIZE
+    for model, vector_model, key, text, queryset in (
+        (JobOpening, JobVector, 'job', job_text, JobOpening.objects.all()),
+        (Candidate, CandidateVector, 'candidate', candidate_text, Candidate.objects.select_related('resume_file')),
+    ):
+        batch = []
+        for obj in queryset.order_by('pk').iterator(chunk_size=chunk_size):
+            batch.append(vector_model(**{f'{key}_id': obj.pk}, **_vector_fields(text(obj))))
+            if len(batch) >= chunk_size:
+                _upsert_vectors(vector_model, key, batch)
+                batch = []
+        if batch:
+            _upsert_vectors(vector_model, key, batch)
+
+
+def _upsert_vectors(vector_model, key, batch):
+    # updated_at is part of the update so the cached indexes see the change
+    vector_model.objects.bulk_create(
+        batch, update_conflicts=True, unique_fields=[key],
+        update_fields=['terms', 'weights', 'text_hash', 'updated_at'],
+    )
+
+
+def _job_top_k(index, chunk_size, k):
+    """
+    Every job's top-k candidates as (candidate ids, job columns, scores)
+    sorted by candidate id, plus every job's threshold.
+    """
+    n_jobs = len(index.ids)
+    # Running per-job top-k: k rows of scores and candidate ids per job column
+    job_scores = np.zeros((k, n_jobs), dtype=np.float32)
+    job_candidates = np.zeros((k, n_jobs), dtype=np.int64)
+    columns = np.arange(n_jobs)
+    for ids, raw, _ in _candidate_vector_chunks(chunk_size):
+        scores = (index.weigh(raw) @ index.matrix.T).toarray()
+        # Reduce the chunk to its k best rows per job, then merge
+        if len(ids) > k:
+            part = np.argpartition(-scores, k - 1, axis=0)[:k]
+        else:
+            part = np.arange(len(ids))[:, None].repeat(n_jobs, axis=1)
+        merged_scores = np.vstack([job_scores, scores[part, columns]])
+        merged_candidates = np.vstack([job_candidates, ids[part]])
+        keep = np.argpartition(-merged_scores, k - 1, axis=0)[:k]
+        job_scores = merged_scores[keep, columns]
+        job_candidates = merged_candidates[keep, columns]
+
+    order = np.argsort(-job_scores, axis=0, kind='stable')
+    job_scores = job_scores[order, columns]
+    job_candidates = job_candidates[order, columns]
+    valid = job_scores > settings.MATCHING_MIN_SCORE
+    thresholds = np.where(valid[-1], job_scores[-1], 0)
+    rows, cols = np.nonzero(valid)
+    candidates, scores = job_candidates[rows, cols], job_scores[rows, cols]
+    order = np.argsort(candidates, kind='stable')
+    return (candidates[order], cols[order], scores[order]), thresholds
+
+
+def rebuild_recommendations(chunk_size=None, revectorize=False):
+    """
+    Recompute every recommendation exactly.
+
+    Candidates are scored against all jobs one chunk at a time as a sparse
+    (chunk x features) @ (features x jobs) product. A first pass over the
+    chunks finds every job's top-k candidates. A second pass finds each
+    candidate's top-k jobs and replaces the chunk's rows, candidate-side and
+    job-side pairs together, in one transaction, so readers never see a
+    list that is emptied or half rebuilt. Job thresholds and the removal of
+    rows for candidates or jobs without a vector are applied last.
+    """
+    chunk_size = chunk_size or settings.MATCHING_CHUNK_SIZE
+    k, min_score = settings.MATCHING_TOP_K, settings.MATCHING_MIN_SCORE
+    if revectorize:
+        vectorize_all(chunk_size)
+
+    index = JobIndex()
+    n_jobs = len(index.ids)
+    if n_jobs:
+        (side_candidates, side_columns, side_scores), job_thresholds = _job_top_k(index, chunk_size, k)
+
+    for ids, raw, _ in _candidate_vector_chunks(chunk_size):
+        pairs = {}
+        kth = np.zeros(len(ids))
+        if n_jobs:
+            scores = (index.weigh(raw) @ index.matrix.T).toarray()
+
+            # Candidate side: top-k jobs of every row at once
+            width = min(k, n_jobs)
+            best = np.argpartition(-scores, width - 1, axis=1)[:, :width]
+            best_scores = np.take_along_axis(scores, best, axis=1)
+            order = np.argsort(-best_scores, axis=1, kind='stable')
+            best = np.take_along_axis(best, order, axis=1)
+            best_scores = np.take_along_axis(best_scores, order, axis=1)
+            valid = best_scores > min_score
+            if width == k:
+                kth = np.where(valid[:, -1], best_scores[:, -1], 0)
+            rows, cols = np.nonzero(valid)
+            for r, c in zip(rows.tolist(), cols.tolist()):
+                pairs[(int(ids[r]), int(index.ids[best[r, c]]))] = float(best_scores[r, c])
+
+            # Job side: the first pass's pairs for this chunk's candidates
+            lo = np.searchsorted(side_candidates, ids[0], side='left')
+            hi = np.searchsorted(side_candidates, ids[-1], side='right')
+            present = np.isin(side_candidates[lo:hi], ids)
+            for c, j, score in zip(
+                side_candidates[lo:hi][present].tolist(),
+                side_columns[lo:hi][present].tolist(),
+                side_scores[lo:hi][present].tolist(),
+            ):
+                pairs.setdefault((c, int(index.ids[j])), score)
+
+        with transaction.atomic():
+            _replace_pairs(Recommendation.objects.filter(candidate_id__in=ids.tolist()), pairs)
+            CandidateVector.objects.bulk_update(
+                [CandidateVector(candidate_id=int(cid), threshold=float(t)) for cid, t in zip(ids, kth)],
+                ['threshold'],
+                batch_size=WRITE_BATCH_SIZE,
+            )
+
+    with transaction.atomic():
+        if n_jobs:
+            JobVector.objects.bulk_update(
+                [JobVector(job_id=int(j), threshold=float(t)) for j, t in zip(index.ids, job_thresholds)],
+                ['threshold'],
+                batch_size=WRITE_BATCH_SIZE,
+            )
+        Recommendation.objects.exclude(candidate_id__in=CandidateVector.objects.values('candidate_id')).delete()
+        Recommendation.objects.exclude(job_id__in=JobVector.objects.values('job_id')).delete()
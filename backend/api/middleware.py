@@ -0,0 +1,42 @@
+import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+
+
+class QueryCounter:
+    """connection.execute_wrapper hook that counts queries and their total time."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += time.perf_counter() - started
+
+
+class QueryCountMiddleware:
+    """
+    Report the SQL queries each request ran in X-DB-Queries and their total
+    time in X-DB-Time (milliseconds). Enabled by QUERY_COUNT_HEADER; the
+    loadtest command sums these headers into its report.
+    """
+
+    def __init__(self, get_response):
+        if not settings.QUERY_COUNT_HEADER:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        counter = QueryCounter()
+        with connection.execute_wrapper(counter):
+            response = self.get_response(request)
+        response['X-DB-Queries'] = str(counter.count)
+        response['X-DB-Time'] = f'{counter.duration * 1000:.1f}'
+        return response
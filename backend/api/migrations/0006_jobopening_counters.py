@@ -0,0 +1,74 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:58
+
+from django.db import migrations, models
+
+
+STATUS_COUNTER_FIELDS = {
+    'Received': 'received_count',
+    'Under Review': 'under_review_count',
+    'Interview': 'interview_count',
+    'Offer Extended': 'offer_extended_count',
+    'Rejected': 'rejected_count',
+    'Withdrawn': 'withdrawn_count',
+}
+
+
+def backfill_counters(apps, schema_editor):
+    JobOpening = apps.get_model('api', 'JobOpening')
+    Application = apps.get_model('api', 'Application')
+    counts = {}
+    rows = Application.objects.values('job_id', 'status').annotate(n=models.Count('id')).order_by()
+    for row in rows:
+        job_counts = counts.setdefault(row['job_id'], {'applications_count': 0})
+        job_counts['applications_count'] += row['n']
+        field = STATUS_COUNTER_FIELDS.get(row['status'])
+        if field:
+            job_counts[field] = job_counts.get(field, 0) + row['n']
+    for job_id, job_counts in counts.items():
+        JobOpening.objects.filter(pk=job_id).update(**job_counts)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_task'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobopening',
+            name='applications_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='jobopening',
+            name='interview_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='jobopening',
+            name='offer_extended_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='jobopening',
+            name='received_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='jobopening',
+            name='rejected_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='jobopening',
+            name='under_review_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='jobopening',
+            name='withdrawn_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
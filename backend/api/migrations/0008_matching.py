@@ -0,0 +1,55 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_resume_store'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CandidateVector',
+            fields=[
+                ('terms', models.BinaryField()),
+                ('weights', models.BinaryField()),
+                ('text_hash', models.CharField(max_length=64)),
+                ('threshold', models.FloatField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('candidate', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='match_vector', serialize=False, to='api.candidate')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='JobVector',
+            fields=[
+                ('terms', models.BinaryField()),
+                ('weights', models.BinaryField()),
+                ('text_hash', models.CharField(max_length=64)),
+                ('threshold', models.FloatField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('job', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='match_vector', serialize=False, to='api.jobopening')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='Recommendation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField()),
+                ('candidate', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recommendations', to='api.candidate')),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recommendations', to='api.jobopening')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['candidate', '-score'], name='recommendation_candidate'), models.Index(fields=['job', '-score'], name='recommendation_job')],
+                'constraints': [models.UniqueConstraint(fields=('candidate', 'job'), name='recommendation_unique_pair')],
+            },
+        ),
+    ]
@@ -0,0 +1,78 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:04
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_matching'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Room',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('location', models.CharField(blank=True, max_length=200)),
+                ('capacity', models.IntegerField(default=1)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Interview',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start', models.DateTimeField()),
+                ('end', models.DateTimeField()),
+                ('type', models.CharField(choices=[('video', 'Video'), ('phone', 'Phone'), ('in-person', 'In person')], default='video', max_length=20)),
+                ('status', models.CharField(choices=[('scheduled', 'Scheduled'), ('completed', 'Completed'), ('cancelled', 'Cancelled'), ('no-show', 'No show')], default='scheduled', max_length=20)),
+                ('meetingLink', models.URLField(blank=True)),
+                ('notes', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('application', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='interviews', to='api.application')),
+            ],
+            options={
+                'ordering': ['start'],
+            },
+        ),
+        migrations.CreateModel(
+            name='InterviewAssignment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start', models.DateTimeField()),
+                ('end', models.DateTimeField()),
+                ('interview', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='assignments', to='api.interview')),
+                ('interviewer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='interview_assignments', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='interview',
+            name='interviewers',
+            field=models.ManyToManyField(related_name='interviews', through='api.InterviewAssignment', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='interview',
+            name='room',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='interviews', to='api.room'),
+        ),
+        migrations.AddIndex(
+            model_name='interviewassignment',
+            index=models.Index(fields=['interviewer', 'start'], name='assignment_interviewer_start'),
+        ),
+        migrations.AddConstraint(
+            model_name='interviewassignment',
+            constraint=models.UniqueConstraint(fields=('interview', 'interviewer'), name='interview_assignment_unique'),
+        ),
+        migrations.AddIndex(
+            model_name='interview',
+            index=models.Index(fields=['room', 'start'], name='interview_room_start'),
+        ),
+        migrations.AddIndex(
+            model_name='interview',
+            index=models.Index(fields=['start'], name='interview_start'),
+        ),
+    ]
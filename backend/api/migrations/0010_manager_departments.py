@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_interviews'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='jobopening',
+            name='department',
+            field=models.CharField(db_index=True, default='Engineering', max_length=100),
+        ),
+        migrations.CreateModel(
+            name='DepartmentAssignment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('department', models.CharField(db_index=True, max_length=100)),
+                ('profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='department_assignments', to='api.userprofile')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('profile', 'department'), name='department_assignment_unique')],
+            },
+        ),
+    ]
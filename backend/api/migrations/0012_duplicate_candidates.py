@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_import_job'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DuplicateCandidatePair',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField()),
+                ('reasons', models.JSONField(blank=True, default=list)),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('DISMISSED', 'Dismissed')], default='PENDING', max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('candidate_a', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='api.candidate')),
+                ('candidate_b', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='api.candidate')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', '-score'], name='duplicate_pair_status_score')],
+                'constraints': [models.UniqueConstraint(fields=('candidate_a', 'candidate_b'), name='duplicate_pair_unique')],
+            },
+        ),
+    ]
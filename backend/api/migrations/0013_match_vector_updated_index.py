@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_duplicate_candidates'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='candidatevector',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.AlterField(
+            model_name='jobvector',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+    ]
@@ -1,8 +1,13 @@
 from django.db import models
 from django.contrib.auth.models import User
-from django.db.models.signals import post_save
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from django.conf import settings
+from django.utils import timezone
 import os
 
 class UserProfile(models.Model):
@@ -19,12 +24,26 @@ class UserProfile(models.Model):
     def __str__(self):
         return f"{self.user.username} - {self.role}"
 
+class DepartmentAssignment(models.Model):
+    """A department whose applications a manager may see."""
+    profile = models.ForeignKey(UserProfile, on_delete=models.CASCADE, related_name='department_assignments')
+    department = models.CharField(max_length=100, db_index=True)
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['profile', 'department'], name='department_assignment_unique'),
+        ]
+    
+    def __str__(self):
+        return f"{self.profile.user.username} - {self.department}"
+
 class Candidate(models.Model):
     fName = models.CharField(max_length=50)
     lName = models.CharField(max_length=50)
     email = models.EmailField(unique=True)
     phone = models.CharField(max_length=15, blank=True)
     resume = models.FileField(upload_to='resumes/', blank=True, null=True)
+    resume_file = models.ForeignKey('ResumeFile', on_delete=models.SET_NULL, null=True, blank=True, related_name='candidates')
     bio = models.TextField(blank=True, max_length=500)
     linkedin = models.URLField(blank=True)
     portfolio = models.URLField(blank=True)
@@ -32,14 +51,65 @@ class Candidate(models.Model):
     def __str__(self):
         return f"{self.fName} {self.lName}"
 
+class ResumeFile(models.Model):
+    """A resume stored once per distinct content, keyed by its SHA-256."""
+    sha256 = models.CharField(max_length=64, unique=True)
+    file = models.FileField(upload_to='resumes/')
+    size = models.BigIntegerField()
+    content_type = models.CharField(max_length=100, blank=True)
+    original_name = models.CharField(max_length=255, blank=True)
+    text = models.TextField(blank=True)
+    search_vector = SearchVectorField(null=True, blank=True)
+    extracted_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        indexes = [
+            GinIndex(fields=['search_vector'], name='resume_search_vector'),
+        ]
+    
+    def __str__(self):
+        return self.original_name or self.sha256
+
 class JobOpening(models.Model):
     title = models.CharField(max_length=100)
     description = models.TextField(blank=True)
     positions = models.IntegerField(default=1)
-    department = models.CharField(max_length=100, default="Engineering")
+    department = models.CharField(max_length=100, default="Engineering", db_index=True)
+    
+    # Denormalized application counters, kept in step by Application.save()
+    # and the post_delete handler below; `manage.py repairjobcounters`
+    # recomputes them from the applications table.
+    applications_count = models.IntegerField(default=0)
+    received_count = models.IntegerField(default=0)
+    under_review_count = models.IntegerField(default=0)
+    interview_count = models.IntegerField(default=0)
+    offer_extended_count = models.IntegerField(default=0)
+    rejected_count = models.IntegerField(default=0)
+    withdrawn_count = models.IntegerField(default=0)
+    COUNTER_FIELDS = [
+        'applications_count', 'received_count', 'under_review_count', 'interview_count',
+        'offer_extended_count', 'rejected_count', 'withdrawn_count',
+    ]
 
     def __str__(self):
         return self.title
+    
+    def save(self, *args, **kwargs):
+        # A full save of an existing job would write back the counters loaded
+        # with the instance and undo adjust_counters() calls made meanwhile
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                f.name for f in self._meta.concrete_fields if not f.primary_key and f.name not in self.COUNTER_FIELDS
+            ]
+        super().save(*args, **kwargs)
+    
+    @classmethod
+    def adjust_counters(cls, job_id, deltas):
+        """Atomically add `deltas` ({field: n}) to a job's counters in one UPDATE."""
+        deltas = {field: delta for field, delta in deltas.items() if delta}
+        if job_id and deltas:
+            cls.objects.filter(pk=job_id).update(**{field: F(field) + delta for field, delta in deltas.items()})
 
 class Application(models.Model):
     STATUS_CHOICES = [
@@ -56,9 +126,46 @@ class Application(models.Model):
     applicationDate = models.DateField(auto_now_add=True)
     status = models.CharField(max_length=50, choices=STATUS_CHOICES, default='Received')
     coverLetter = models.TextField(blank=True)
+    
+    # JobOpening counter field for each status
+    STATUS_COUNTER_FIELDS = {
+        'Received': 'received_count',
+        'Under Review': 'under_review_count',
+        'Interview': 'interview_count',
+        'Offer Extended': 'offer_extended_count',
+        'Rejected': 'rejected_count',
+        'Withdrawn': 'withdrawn_count',
+    }
 
     def __str__(self):
         return f"{self.candidate} for {self.job}"
+    
+    @classmethod
+    def counter_deltas(cls, status, sign=1):
+        deltas = {'applications_count': sign}
+        if status in cls.STATUS_COUNTER_FIELDS:
+            deltas[cls.STATUS_COUNTER_FIELDS[status]] = sign
+        return deltas
+    
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            previous = None
+            if not self._state.adding and self.pk:
+                # Lock the stored row so concurrent status changes count once each
+                previous = Application.objects.select_for_update().filter(pk=self.pk).values('status', 'job_id').first()
+            super().save(*args, **kwargs)
+            
+            if previous is None:
+                JobOpening.adjust_counters(self.job_id, self.counter_deltas(self.status))
+            elif previous['status'] != self.status or previous['job_id'] != self.job_id:
+                if previous['job_id'] == self.job_id:
+                    deltas = self.counter_deltas(previous['status'], -1)
+                    for field, delta in self.counter_deltas(self.status).items():
+                        deltas[field] = deltas.get(field, 0) + delta
+                    JobOpening.adjust_counters(self.job_id, deltas)
+                else:
+                    JobOpening.adjust_counters(previous['job_id'], self.counter_deltas(previous['status'], -1))
+                    JobOpening.adjust_counters(self.job_id, self.counter_deltas(self.status))
 
 class Notification(models.Model):
     NOTIFICATION_TYPES = [
@@ -78,10 +185,201 @@ class Notification(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='notification_user_created'),
+            models.Index(fields=['user', 'is_read'], name='notification_user_unread'),
+            models.Index(fields=['is_read', 'created_at'], name='notification_read_created'),
+        ]
     
     def __str__(self):
         return f"{self.user.username} - {self.title}"
 
+class Room(models.Model):
+    name = models.CharField(max_length=100, unique=True)
+    location = models.CharField(max_length=200, blank=True)
+    capacity = models.IntegerField(default=1)
+    
+    def __str__(self):
+        return self.name
+
+class Interview(models.Model):
+    TYPE_CHOICES = [
+        ('video', 'Video'),
+        ('phone', 'Phone'),
+        ('in-person', 'In person'),
+    ]
+    STATUS_CHOICES = [
+        ('scheduled', 'Scheduled'),
+        ('completed', 'Completed'),
+        ('cancelled', 'Cancelled'),
+        ('no-show', 'No show'),
+    ]
+    # Interviews in these states no longer block anyone's calendar
+    INACTIVE_STATUSES = ['cancelled']
+    
+    application = models.ForeignKey(Application, on_delete=models.CASCADE, related_name='interviews')
+    interviewers = models.ManyToManyField(User, through='InterviewAssignment', related_name='interviews')
+    room = models.ForeignKey(Room, on_delete=models.SET_NULL, null=True, blank=True, related_name='interviews')
+    start = models.DateTimeField()
+    end = models.DateTimeField()
+    type = models.CharField(max_length=20, choices=TYPE_CHOICES, default='video')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='scheduled')
+    meetingLink = models.URLField(blank=True)
+    notes = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['start']
+        indexes = [
+            models.Index(fields=['room', 'start'], name='interview_room_start'),
+            models.Index(fields=['start'], name='interview_start'),
+        ]
+    
+    def __str__(self):
+        return f"{self.application} at {self.start:%Y-%m-%d %H:%M}"
+
+class InterviewAssignment(models.Model):
+    """An interviewer on an interview, with the time copied for indexed range scans."""
+    interview = models.ForeignKey(Interview, on_delete=models.CASCADE, related_name='assignments')
+    interviewer = models.ForeignKey(User, on_delete=models.CASCADE, related_name='interview_assignments')
+    start = models.DateTimeField()
+    end = models.DateTimeField()
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['interview', 'interviewer'], name='interview_assignment_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['interviewer', 'start'], name='assignment_interviewer_start'),
+        ]
+
+class MatchVector(models.Model):
+    """Hashed term vector used for matching (see api/matching.py)."""
+    terms = models.BinaryField()  # int32 term ids
+    weights = models.BinaryField()  # float32 sublinear term frequencies
+    text_hash = models.CharField(max_length=64)
+    # Score of this row's k-th best match, used by incremental refreshes
+    threshold = models.FloatField(default=0)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)  # the matching caches re-read recently updated rows
+    
+    class Meta:
+        abstract = True
+
+class CandidateVector(MatchVector):
+    candidate = models.OneToOneField(Candidate, on_delete=models.CASCADE, primary_key=True, related_name='match_vector')
+
+class JobVector(MatchVector):
+    job = models.OneToOneField(JobOpening, on_delete=models.CASCADE, primary_key=True, related_name='match_vector')
+
+class Recommendation(models.Model):
+    candidate = models.ForeignKey(Candidate, on_delete=models.CASCADE, related_name='recommendations')
+    job = models.ForeignKey(JobOpening, on_delete=models.CASCADE, related_name='recommendations')
+    score = models.FloatField()
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['candidate', 'job'], name='recommendation_unique_pair'),
+        ]
+        indexes = [
+            models.Index(fields=['candidate', '-score'], name='recommendation_candidate'),
+            models.Index(fields=['job', '-score'], name='recommendation_job'),
+        ]
+    
+    def __str__(self):
+        return f"{self.candidate} ~ {self.job} ({self.score:.2f})"
+
+class DuplicateCandidatePair(models.Model):
+    """Two candidates that are probably the same person (see api/dedupe.py)."""
+    STATUS_CHOICES = [
+        ('PENDING', 'Pending'),
+        ('DISMISSED', 'Dismissed'),
+    ]
+    
+    # candidate_a always has the lower id, so each pair is stored once
+    candidate_a = models.ForeignKey(Candidate, on_delete=models.CASCADE, related_name='+')
+    candidate_b = models.ForeignKey(Candidate, on_delete=models.CASCADE, related_name='+')
+    score = models.FloatField()
+    reasons = models.JSONField(default=list, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='PENDING')
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['candidate_a', 'candidate_b'], name='duplicate_pair_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['status', '-score'], name='duplicate_pair_status_score'),
+        ]
+    
+    def __str__(self):
+        return f"{self.candidate_a} ~ {self.candidate_b} ({self.score:.2f})"
+
+class ImportJob(models.Model):
+    """A bulk candidate/application import, processed by api.imports.run_import."""
+    STATUS_CHOICES = [
+        ('QUEUED', 'Queued'),
+        ('RUNNING', 'Running'),
+        ('DONE', 'Done'),
+        ('FAILED', 'Failed'),
+    ]
+    FORMAT_CHOICES = [
+        ('csv', 'CSV'),
+        ('ndjson', 'NDJSON'),
+    ]
+    
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='import_jobs')
+    file = models.FileField(upload_to='imports/')
+    original_name = models.CharField(max_length=255, blank=True)
+    format = models.CharField(max_length=10, choices=FORMAT_CHOICES)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='QUEUED')
+    total_rows = models.IntegerField(default=0)
+    processed_rows = models.IntegerField(default=0)
+    candidates_created = models.IntegerField(default=0)
+    candidates_updated = models.IntegerField(default=0)
+    applications_created = models.IntegerField(default=0)
+    error_count = models.IntegerField(default=0)
+    # First IMPORT_MAX_ERRORS rejected rows: [{'row', 'email', 'errors': {field: message}}]
+    errors = models.JSONField(default=list, blank=True)
+    message = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    def __str__(self):
+        return f"{self.original_name or self.file.name} ({self.status})"
+
+class Task(models.Model):
+    STATUS_CHOICES = [
+        ('QUEUED', 'Queued'),
+        ('RUNNING', 'Running'),
+        ('DONE', 'Done'),
+        ('FAILED', 'Failed'),
+    ]
+    
+    name = models.CharField(max_length=200)
+    args = models.JSONField(default=list, blank=True)
+    kwargs = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='QUEUED')
+    attempts = models.IntegerField(default=0)
+    max_attempts = models.IntegerField(default=5)
+    run_at = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=200, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'run_at'], name='task_status_run_at'),
+        ]
+    
+    def __str__(self):
+        return f"{self.name} ({self.status})"
+
+@receiver(post_delete, sender=Application)
+def decrement_job_counters(sender, instance, **kwargs):
+    JobOpening.adjust_counters(instance.job_id, Application.counter_deltas(instance.status, -1))
+
 @receiver(post_save, sender=User)
 def create_user_profile(sender, instance, created, **kwargs):
     if created:
@@ -0,0 +1,35 @@
+from .models import DepartmentAssignment
+
+_UNSET = object()
+
+
+def allowed_departments(request):
+    """
+    Departments the requesting user may see, or None for no restriction.
+
+    Managers are limited to their DepartmentAssignment rows; a manager with
+    no assignments sees nothing. The result is computed once and cached on
+    the underlying HttpRequest, so every queryset built while serving the
+    request reuses the same list.
+    """
+    http_request = getattr(request, '_request', request)
+    cached = getattr(http_request, '_allowed_departments', _UNSET)
+    if cached is not _UNSET:
+        return cached
+
+    user = request.user
+    departments = None
+    if hasattr(user, 'profile') and user.profile.role == 'MANAGER':
+        departments = frozenset(
+            DepartmentAssignment.objects.filter(profile=user.profile).values_list('department', flat=True)
+        )
+    http_request._allowed_departments = departments
+    return departments
+
+
+def scope_by_department(queryset, request, department_field):
+    """Restrict `queryset` to the user's departments through `department_field`."""
+    departments = allowed_departments(request)
+    if departments is None:
+        return queryset
+    return queryset.filter(**{f'{department_field}__in': departments})
@@ -0,0 +1,255 @@
+import logging
+import os
+import random
+import socket
+import threading
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import autodiscover_modules
+
+from .models import Task
+
+logger = logging.getLogger(__name__)
+
+_registry = {}
+
+
+def task(func=None, *, name=None, max_attempts=None):
+    """
+    Register a function as a background task.
+
+    The function gets a `delay(*args, **kwargs)` attribute that enqueues it.
+    Arguments are stored as JSON, so pass ids rather than model instances.
+    """
+    def register(func):
+        task_name = name or f'{func.__module__}.{func.__name__}'
+        _registry[task_name] = func
+        func.task_name = task_name
+        func.delay = lambda *args, **kwargs: enqueue(task_name, *args, max_attempts=max_attempts, **kwargs)
+        return func
+
+    return register(func) if func is not None else register
+
+
+def enqueue(name, *args, run_at=None, max_attempts=None, **kwargs):
+    """
+    Add a task to the queue.
+
+    The row is inserted on the caller's connection, so when called inside a
+    transaction the task only becomes visible to workers once it commits and
+    disappears with a rollback. With TASK_QUEUE_EAGER the task runs in-process
+    after commit instead, which is handy in development without a worker.
+    """
+    if settings.TASK_QUEUE_EAGER:
+        transaction.on_commit(lambda: _registry[name](*args, **kwargs))
+        return None
+    return Task.objects.create(
+        name=name,
+        args=list(args),
+        kwargs=kwargs,
+        run_at=run_at or timezone.now(),
+        max_attempts=max_attempts or settings.TASK_QUEUE_MAX_ATTEMPTS,
+    )
+
+
+def autodiscover():
+    """Import the `tasks` module of every installed app so tasks are registered."""
+    autodiscover_modules('tasks')
+
+
+def claim_tasks(worker_id, limit=1):
+    """
+    Lock up to `limit` due tasks for this worker.
+
+    Rows locked by another worker's claim are skipped rather than waited on
+    (SELECT ... FOR UPDATE SKIP LOCKED), so any number of workers can poll
+    the same table without contending.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        tasks = list(
+            Task.objects.select_for_update(skip_locked=True)
+            .filter(status='QUEUED', run_at__lte=now)
+            .order_by('run_at', 'id')[:limit]
+        )
+        if not tasks:
+            return []
+        Task.objects.filter(id__in=[t.id for t in tasks]).update(
+            status='RUNNING', locked_by=worker_id, locked_at=now, attempts=F('attempts') + 1
+        )
+    for t in tasks:
+        t.status, t.locked_by, t.locked_at, t.attempts = 'RUNNING', worker_id, now, t.attempts + 1
+    return tasks
+
+
+def retry_delay(attempts):
+    """Exponential backoff with jitter, capped at TASK_QUEUE_MAX_BACKOFF seconds."""
+    delay = min(settings.TASK_QUEUE_BACKOFF * 2 ** (attempts - 1), settings.TASK_QUEUE_MAX_BACKOFF)
+    return delay * random.uniform(0.8, 1.2)
+
+
+def run_task(t):
+    """
+    Run a claimed task and record the outcome.
+
+    The outcome is only written while the task is still locked by this
+    worker. If its heartbeat lapsed and requeue_stale_tasks() handed it to
+    another worker, the lease is lost: this run's result is dropped and
+    False is returned, leaving the task to its new owner.
+    """
+    func = _registry.get(t.name)
+    lease = Task.objects.filter(id=t.id, status='RUNNING', locked_by=t.locked_by)
+    try:
+        if func is None:
+            raise LookupError(f'Unknown task {t.name!r}')
+        func(*t.args, **t.kwargs)
+    except Exception:
+        error = traceback.format_exc()
+        if t.attempts >= t.max_attempts:
+            if lease.update(status='FAILED', last_error=error, finished_at=timezone.now()):
+                logger.error('Task %s (%s) failed permanently:\n%s', t.id, t.name, error)
+            else:
+                _lost_lease(t)
+        else:
+            updated = lease.update(
+                status='QUEUED',
+                locked_by='',
+                last_error=error,
+                run_at=timezone.now() + timedelta(seconds=retry_delay(t.attempts)),
+            )
+            if updated:
+                logger.warning('Task %s (%s) failed, retrying:\n%s', t.id, t.name, error)
+            else:
+                _lost_lease(t)
+        return False
+    if not lease.update(status='DONE', finished_at=timezone.now()):
+        _lost_lease(t)
+        return False
+    return True
+
+
+def _lost_lease(t):
+    logger.warning('Task %s (%s) is no longer locked by %s; its result was discarded', t.id, t.name, t.locked_by)
+
+
+def heartbeat(task_ids):
+    """Refresh the locks of running tasks so requeue_stale_tasks() leaves them alone."""
+    return Task.objects.filter(id__in=task_ids, status='RUNNING').update(locked_at=timezone.now())
+
+
+def requeue_stale_tasks(timeout=None):
+    """
+    Put back tasks whose worker died while running them.
+
+    Live workers refresh locked_at every TASK_QUEUE_HEARTBEAT_INTERVAL, so
+    only tasks without a heartbeat for `timeout` seconds count as lost. A
+    lost task that has used up its attempts is marked FAILED instead.
+    """
+    timeout = timeout or settings.TASK_QUEUE_LOCK_TIMEOUT
+    now = timezone.now()
+    stale = Task.objects.filter(status='RUNNING', locked_at__lt=now - timedelta(seconds=timeout))
+    failed = stale.filter(attempts__gte=F('max_attempts')).update(
+        status='FAILED', last_error='Worker lost while running the task', finished_at=now,
+    )
+    if failed:
+        logger.error('%s lost task(s) failed permanently', failed)
+    return stale.update(status='QUEUED', locked_by='')
+
+
+def purge_finished_tasks(hours=None, batch_size=5000):
+    """Delete completed tasks older than `hours` in batches."""
+    hours = settings.TASK_QUEUE_RETENTION_HOURS if hours is None else hours
+    cutoff = timezone.now() - timedelta(hours=hours)
+    finished = Task.objects.filter(status='DONE', finished_at__lt=cutoff).order_by()
+    deleted = 0
+    while True:
+        ids = list(finished.values_list('id', flat=True)[:batch_size])
+        if not ids:
+            return deleted
+        deleted += Task.objects.filter(id__in=ids).delete()[0]
+
+
+class Worker:
+    """Polls the task table from `concurrency` threads until stopped."""
+
+    def __init__(self, concurrency=1, poll_interval=1.0, batch_size=1, burst=False):
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self.burst = burst
+        self.stopping = threading.Event()
+        self.finished = threading.Event()
+        self.worker_id = f'{socket.gethostname()}:{os.getpid()}'
+        self._running = set()
+        self._running_lock = threading.Lock()
+        self._maintenance_lock = threading.Lock()
+        self._last_maintenance = 0.0
+
+    def stop(self):
+        self.stopping.set()
+
+    def maintenance(self):
+        with self._maintenance_lock:
+            if time.monotonic() - self._last_maintenance < settings.TASK_QUEUE_MAINTENANCE_INTERVAL:
+                return
+            self._last_maintenance = time.monotonic()
+        requeue_stale_tasks()
+        purge_finished_tasks()
+
+    def loop(self, index):
+        worker_id = f'{self.worker_id}:{index}'
+        try:
+            while not self.stopping.is_set():
+                close_old_connections()
+                self.maintenance()
+                tasks = claim_tasks(worker_id, self.batch_size)
+                with self._running_lock:
+                    self._running.update(t.id for t in tasks)
+                for t in tasks:
+                    try:
+                        run_task(t)
+                    finally:
+                        with self._running_lock:
+                            self._running.discard(t.id)
+                if not tasks:
+                    if self.burst:
+                        return
+                    self.stopping.wait(self.poll_interval)
+        finally:
+            connection.close()
+
+    def beat(self):
+        """Heartbeat the claimed tasks until every worker thread has finished."""
+        try:
+            while not self.finished.wait(settings.TASK_QUEUE_HEARTBEAT_INTERVAL):
+                with self._running_lock:
+                    task_ids = list(self._running)
+                if not task_ids:
+                    continue
+                close_old_connections()
+                try:
+                    heartbeat(task_ids)
+                except Exception:
+                    logger.exception('Task heartbeat failed')
+        finally:
+            connection.close()
+
+    def run(self):
+        threads = [
+            threading.Thread(target=self.loop, args=(i,), name=f'task-worker-{i}', daemon=True)
+            for i in range(self.concurrency)
+        ]
+        beat = threading.Thread(target=self.beat, name='task-heartbeat', daemon=True)
+        for thread in [*threads, beat]:
+            thread.start()
+        for thread in threads:
+            while thread.is_alive():
+                thread.join(0.5)
+        self.finished.set()
+        beat.join()
@@ -0,0 +1,253 @@
+"""
+Columnar report snapshots.
+
+build_snapshot() reads the applications and jobs once and writes them as
+plain numpy columns (.npy) into a new directory under REPORT_SNAPSHOT_DIR:
+status, department and job codes, application dates as day numbers and
+candidate ids. A small `current` file, replaced atomically, names the
+directory readers should use, so a snapshot is never read half-written.
+
+The reporting API memory-maps the current snapshot and answers filters,
+group-bys and time series with vectorized numpy over those columns, so
+report traffic never queries the transactional tables.
+"""
+import json
+import os
+import shutil
+import threading
+from array import array
+from datetime import date, timedelta
+
+import numpy as np
+from django.conf import settings
+from django.utils import timezone
+
+from .models import Application, JobOpening
+
+EPOCH = date(1970, 1, 1)
+STATUSES = [choice for choice, _ in Application.STATUS_CHOICES]
+HIRED_STATUS = 'Offer Extended'
+READ_BATCH_SIZE = 10000
+POINTER = 'current'
+
+
+def _day(value):
+    return (value - EPOCH).days
+
+
+def build_snapshot(directory=None, keep=None):
+    """Write a new snapshot, point `current` at it and prune old ones. Returns its directory."""
+    directory = directory or settings.REPORT_SNAPSHOT_DIR
+    keep = keep or settings.REPORT_SNAPSHOT_KEEP
+    generated_at = timezone.now()
+    name = generated_at.strftime('%Y%m%dT%H%M%S%fZ')
+    path = os.path.join(directory, name)
+    os.makedirs(path)
+
+    departments = {}
+    jobs = {'id': array('q'), 'department': array('h'), 'positions': array('l')}
+    for job_id, department, positions in JobOpening.objects.order_by('id').values_list('id', 'department', 'positions'):
+        jobs['id'].append(job_id)
+        jobs['department'].append(departments.setdefault(department, len(departments)))
+        jobs['positions'].append(positions)
+    job_departments = dict(zip(jobs['id'], jobs['department']))
+
+    status_codes = {status: code for code, status in enumerate(STATUSES)}
+    columns = {
+        'status': array('b'), 'department': array('h'), 'job': array('q'),
+        'day': array('l'), 'candidate': array('q'),
+    }
+    applications = Application.objects.order_by().values_list('job_id', 'status', 'applicationDate', 'candidate_id')
+    for job_id, status, applied, candidate_id in applications.iterator(chunk_size=READ_BATCH_SIZE):
+        columns['status'].append(status_codes.get(status, -1))
+        columns['department'].append(job_departments.get(job_id, -1))
+        columns['job'].append(job_id)
+        columns['day'].append(_day(applied))
+        columns['candidate'].append(candidate_id)
+
+    dtypes = {'b': np.int8, 'h': np.int16, 'l': np.int32, 'q': np.int64}
+    for prefix, group in (('app', columns), ('job', jobs)):
+        for column, values in group.items():
+            np.save(os.path.join(path, f'{prefix}_{column}.npy'), np.frombuffer(values, dtype=values.typecode).astype(dtypes[values.typecode]))
+    with open(os.path.join(path, 'meta.json'), 'w') as f:
+        json.dump({
+            'generated_at': generated_at.isoformat(),
+            'statuses': STATUSES,
+            'departments': sorted(departments, key=departments.get),
+            'applications': len(columns['status']),
+            'jobs': len(jobs['id']),
+        }, f)
+
+    pointer = os.path.join(directory, POINTER)
+    with open(pointer + '.tmp', 'w') as f:
+        f.write(name)
+    os.replace(pointer + '.tmp', pointer)
+
+    # Readers that still map an older snapshot keep their open files on POSIX
+    snapshots = sorted(entry for entry in os.listdir(directory) if os.path.isdir(os.path.join(directory, entry)))
+    for old in snapshots[:-keep]:
+        shutil.rmtree(os.path.join(directory, old), ignore_errors=True)
+    return path
+
+
+class Snapshot:
+    """The arrays of one snapshot directory, memory-mapped read-only."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, 'meta.json')) as f:
+            self.meta = json.load(f)
+        self.generated_at = self.meta['generated_at']
+        self.statuses = self.meta['statuses']
+        self.departments = self.meta['departments']
+
+        def load(name):
+            return np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r')
+
+        self.status = load('app_status')
+        self.department = load('app_department')
+        self.job = load('app_job')
+        self.day = load('app_day')
+        self.candidate = load('app_candidate')
+        self.job_id = load('job_id')
+        self.job_department = load('job_department')
+        self.job_positions = load('job_positions')
+
+    def department_codes(self, names):
+        index = {name: code for code, name in enumerate(self.departments)}
+        return [index[name] for name in names if name in index]
+
+    def mask(self, departments=None, statuses=None, jobs=None, start=None, end=None):
+        """Boolean mask over applications; every argument is optional and they combine with AND."""
+        mask = np.ones(len(self.status), dtype=bool)
+        if departments is not None:
+            mask &= np.isin(self.department, self.department_codes(departments))
+        if statuses is not None:
+            mask &= np.isin(self.status, [self.statuses.index(s) for s in statuses if s in self.statuses])
+        if jobs is not None:
+            mask &= np.isin(self.job, list(jobs))
+        if start is not None:
+            mask &= self.day >= _day(start)
+        if end is not None:
+            mask &= self.day <= _day(end)
+        return mask
+
+    def summary(self, mask, departments=None):
+        statuses = self.status[mask]
+        by_status = np.bincount(statuses[statuses >= 0], minlength=len(self.statuses))
+        total = int(mask.sum())
+        hired = int(by_status[self.statuses.index(HIRED_STATUS)])
+        job_mask = np.ones(len(self.job_id), dtype=bool)
+        if departments is not None:
+            job_mask &= np.isin(self.job_department, self.department_codes(departments))
+        return {
+            'applications': total,
+            'candidates': int(len(np.unique(self.candidate[mask]))),
+            'hired': hired,
+            'hire_rate': round(hired / total, 4) if total else 0.0,
+            'by_status': dict(zip(self.statuses, by_status.tolist())),
+            'jobs': int(job_mask.sum()),
+            'positions': int(self.job_positions[job_mask].sum()),
+        }
+
+    def group_by(self, mask, field):
+        """Application and hire counts per department, status or job."""
+        hired = self.status == self.statuses.index(HIRED_STATUS)
+        if field == 'job':
+            jobs, inverse = np.unique(self.job[mask], return_inverse=True)
+            counts = np.bincount(inverse, minlength=len(jobs))
+            hires = np.bincount(inverse, weights=hired[mask], minlength=len(jobs))
+            return [
+                {'job': int(job), 'applications': int(n), 'hired': int(h)}
+                for job, n, h in zip(jobs, counts, hires)
+            ]
+        codes, labels = (self.department, self.departments) if field == 'department' else (self.status, self.statuses)
+        selected = codes[mask]
+        # Code -1 marks an application whose job was added after the jobs were read
+        known = selected >= 0
+        counts = np.bincount(selected[known], minlength=len(labels))
+        hires = np.bincount(selected[known], weights=hired[mask][known], minlength=len(labels))
+        rows = [
+            {field: label, 'applications': int(n), 'hired': int(h)}
+            for label, n, h in zip(labels, counts, hires)
+            if n
+        ]
+        # Department codes follow first appearance; statuses keep their pipeline order
+        return sorted(rows, key=lambda row: row[field]) if field == 'department' else rows
+
+    def time_series(self, mask, interval='day', split=None):
+        """Application counts per day, week (Monday) or month, optionally split by status or department."""
+        days = np.asarray(self.day[mask])
+        if not len(days):
+            return []
+        dates = days.astype('datetime64[D]')
+        if interval == 'month':
+            buckets = dates.astype('datetime64[M]').astype('datetime64[D]')
+        elif interval == 'week':
+            # 1970-01-01 was a Thursday; shift so weeks start on Monday
+            buckets = ((days + 3) // 7 * 7 - 3).astype('datetime64[D]')
+        else:
+            buckets = dates
+        periods, inverse = np.unique(buckets, return_inverse=True)
+
+        if split is None:
+            counts = np.bincount(inverse, minlength=len(periods))
+            return [{'period': str(p), 'applications': int(n)} for p, n in zip(periods, counts)]
+
+        codes, labels = (self.department, self.departments) if split == 'department' else (self.status, self.statuses)
+        selected = np.asarray(codes[mask])
+        known = selected >= 0
+        # One bincount over (period, label) pairs gives the whole table
+        table = np.bincount(
+            inverse[known] * len(labels) + selected[known], minlength=len(periods) * len(labels),
+        ).reshape(len(periods), len(labels))
+        return [
+            {'period': str(p), **{label: int(n) for label, n in zip(labels, row) if n}}
+            for p, row in zip(periods, table)
+        ]
+
+
+_current = None
+_lock = threading.Lock()
+
+
+def current_snapshot(directory=None):
+    """The latest snapshot, re-opened only when the `current` pointer changes; None if none exists."""
+    global _current
+    directory = directory or settings.REPORT_SNAPSHOT_DIR
+    try:
+        with open(os.path.join(directory, POINTER)) as f:
+            name = f.read().strip()
+    except FileNotFoundError:
+        return None
+    path = os.path.join(directory, name)
+    with _lock:
+        if _current is None or _current.path != path:
+            _current = Snapshot(path)
+        return _current
+
+
+def parse_date(value, name):
+    """An ISO date from a query parameter, None if absent; ValueError names the bad parameter."""
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f'{name} must be a date (YYYY-MM-DD)') from None
+
+
+def date_range(params, today=None):
+    """
+    (start, end) from `start`/`end` ISO dates or a `days` window ending
+    today, as Reports.tsx offers. Raises ValueError for an invalid value.
+    """
+    start, end = parse_date(params.get('start'), 'start'), parse_date(params.get('end'), 'end')
+    days = params.get('days')
+    if days and not days.isdigit():
+        raise ValueError('days must be a whole number')
+    if days and int(days) > settings.REPORT_MAX_DAYS:
+        raise ValueError(f'days must be at most {settings.REPORT_MAX_DAYS}')
+    if start is None and days:
+        start = (today or timezone.now().date()) - timedelta(days=int(days))
+    return start, end
@@ -0,0 +1,176 @@
+import hashlib
+import multiprocessing
+import os
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.contrib.postgres.search import SearchVector
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler, StopUpload
+from django.db import IntegrityError, transaction
+from django.db.models import Value
+from django.utils import timezone
+
+from .models import ResumeFile
+from .textextract import extract_text
+
+RESUME_DIR = 'resumes'
+ALLOWED_EXTENSIONS = {'.pdf', '.doc', '.docx', '.odt', '.rtf', '.txt', '.md'}
+
+
+def _spool_path():
+    spool_dir = os.path.join(settings.MEDIA_ROOT, RESUME_DIR, 'tmp')
+    os.makedirs(spool_dir, exist_ok=True)
+    return os.path.join(spool_dir, uuid.uuid4().hex)
+
+
+def _extension(file_name):
+    extension = os.path.splitext(file_name or '')[1].lower()
+    return extension if extension in ALLOWED_EXTENSIONS else ''
+
+
+class HashedUploadedFile(UploadedFile):
+    """An upload spooled to disk under MEDIA_ROOT together with its SHA-256."""
+
+    def __init__(self, file, name, content_type, size, charset, sha256, content_type_extra=None):
+        super().__init__(file, name, content_type, size, charset, content_type_extra)
+        self.sha256 = sha256
+
+    def temporary_file_path(self):
+        return self.file.name
+
+    def close(self):
+        # Django closes every request file once the response is sent. A spool
+        # that store_resume() did not move into the store is removed then,
+        # like a TemporaryUploadedFile, so early error responses leak nothing.
+        self.file.close()
+        try:
+            os.remove(self.temporary_file_path())
+        except FileNotFoundError:
+            pass
+
+
+class HashingUploadHandler(FileUploadHandler):
+    """
+    Upload handler that writes each chunk straight to a spool file next to
+    the resume store while feeding an incremental SHA-256, so uploads are
+    never held in memory and never copied a second time to be hashed.
+    """
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.digest = hashlib.sha256()
+        self.size = 0
+        self.spool = open(_spool_path(), 'wb+')
+
+    def receive_data_chunk(self, raw_data, start):
+        self.size += len(raw_data)
+        if self.size > settings.RESUME_MAX_UPLOAD_SIZE:
+            self.upload_interrupted()
+            raise StopUpload(connection_reset=True)
+        self.digest.update(raw_data)
+        self.spool.write(raw_data)
+        return None
+
+    def file_complete(self, file_size):
+        self.spool.flush()
+        self.spool.seek(0)
+        return HashedUploadedFile(
+            self.spool, self.file_name, self.content_type, file_size, self.charset,
+            self.digest.hexdigest(), self.content_type_extra,
+        )
+
+    def upload_interrupted(self):
+        spool = getattr(self, 'spool', None)
+        if spool is not None and not spool.closed:
+            spool.close()
+            os.remove(spool.name)
+
+
+def _spool_upload(upload):
+    """Stream any UploadedFile to a spool file chunk by chunk, hashing as it goes."""
+    digest = hashlib.sha256()
+    path = _spool_path()
+    with open(path, 'wb') as spool:
+        for chunk in upload.chunks():
+            digest.update(chunk)
+            spool.write(chunk)
+    return path, digest.hexdigest()
+
+
+def store_resume(upload):
+    """
+    Put an uploaded resume into the content-addressed store.
+
+    Files are stored once per SHA-256 under resumes/<aa>/<sha256><ext>;
+    re-uploading identical content returns the existing ResumeFile. New files
+    get a background text-extraction task. Returns (resume_file, created).
+    """
+    if isinstance(upload, HashedUploadedFile):
+        upload.file.close()
+        spool, sha256 = upload.temporary_file_path(), upload.sha256
+    else:
+        spool, sha256 = _spool_upload(upload)
+
+    existing = ResumeFile.objects.filter(sha256=sha256).first()
+    if existing is not None:
+        os.remove(spool)
+        return existing, False
+
+    name = f'{RESUME_DIR}/{sha256[:2]}/{sha256}{_extension(upload.name)}'
+    path = default_storage.path(name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # The spool lives on the same filesystem, so this is an atomic rename
+    os.replace(spool, path)
+
+    try:
+        with transaction.atomic():
+            resume = ResumeFile.objects.create(
+                sha256=sha256,
+                file=name,
+                size=upload.size,
+                content_type=upload.content_type or '',
+                original_name=(upload.name or '')[:255],
+            )
+            # Imported here: api.tasks imports this module
+            from .tasks import extract_resume_text
+            extract_resume_text.delay(resume.id)
+    except IntegrityError:
+        # A concurrent upload of the same file won the race
+        return ResumeFile.objects.get(sha256=sha256), False
+    return resume, True
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _extraction_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # Spawned rather than forked: the worker process runs threads
+            _pool = ProcessPoolExecutor(
+                max_workers=settings.RESUME_EXTRACTION_PROCESSES,
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+        return _pool
+
+
+def index_resume_text(resume_id):
+    """Extract a stored resume's text in the process pool and index it for search."""
+    resume = ResumeFile.objects.filter(pk=resume_id).first()
+    if resume is None:
+        return
+    future = _extraction_pool().submit(
+        extract_text, resume.file.path, os.path.splitext(resume.file.name)[1], settings.RESUME_TEXT_MAX_CHARS,
+    )
+    text = future.result(timeout=settings.RESUME_EXTRACTION_TIMEOUT)
+    ResumeFile.objects.filter(pk=resume_id).update(
+        text=text,
+        search_vector=SearchVector(Value(text), config=settings.RESUME_SEARCH_CONFIG),
+        extracted_at=timezone.now(),
+    )
@@ -0,0 +1,247 @@
+import time
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import Notification
+
+
+def prune_read_notifications(days=None, batch_size=None, pause=0.0, dry_run=False):
+    """
+    Delete read notifications older than `days` in batches of `batch_size`.
+
+    Each batch is its own short transaction (select a page of ids via the
+    (is_read, created_at) index, then delete by primary key), so no lock is
+    held across the whole run. Returns the number of rows deleted.
+    """
+    days = settings.NOTIFICATION_RETENTION_DAYS if days is None else days
+    batch_size = batch_size or settings.NOTIFICATION_PRUNE_BATCH_SIZE
+    cutoff = timezone.now() - timedelta(days=days)
+    expired = Notification.objects.filter(is_read=True, created_at__lt=cutoff).order_by()
+
+    if dry_run:
+        return expired.count()
+
+    deleted = 0
+    while True:
+        with transaction.atomic():
+            ids = list(expired.values_list('id', flat=True)[:batch_size])
+            if not ids:
+                break
+            count, _ = Notification.objects.filter(id__in=ids).delete()
+        deleted += count
+        if len(ids) < batch_size:
+            break
+        if pause:
+            time.sleep(pause)
+    return deleted
+
+
+# --- PostgreSQL monthly partitioning -------------------------------------
+
+def _table():
+    return Notification._meta.db_table
+
+
+def _month_start(value):
+    return date(value.year, value.month, 1)
+
+
+def _add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _partition_name(month):
+    return f'{_table()}_p{month:%Y%m}'
+
+
+def partitioning_supported():
+    return connection.vendor == 'postgresql'
+
+
+def is_partitioned():
+    if not partitioning_supported():
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT 1 FROM pg_partitioned_table pt
+            JOIN pg_class c ON c.oid = pt.partrelid
+            WHERE c.relname = %s AND c.relnamespace = to_regnamespace(current_schema())
+            """,
+            [_table()],
+        )
+        return cursor.fetchone() is not None
+
+
+def list_partitions():
+    """Return {month: partition_name} for the monthly partitions of the table."""
+    prefix = f'{_table()}_p'
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT c.relname FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            JOIN pg_class p ON p.oid = i.inhparent
+            WHERE p.relname = %s AND p.relnamespace = to_regnamespace(current_schema())
+            """,
+            [_table()],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+    partitions = {}
+    for name in names:
+        suffix = name[len(prefix):]
+        if name.startswith(prefix) and len(suffix) == 6 and suffix.isdigit():
+            partitions[date(int(suffix[:4]), int(suffix[4:]), 1)] = name
+    return partitions
+
+
+def _create_partition(cursor, month):
+    """
+    Create the partition for `month`.
+
+    PostgreSQL refuses to create a partition while the DEFAULT partition
+    holds rows in its range, which happens when a month's partition is
+    created late. Those rows are parked in a temporary table and inserted
+    back through the parent once the partition exists.
+    """
+    qn = connection.ops.quote_name
+    table, default = _table(), f'{_table()}_default'
+    bounds = [month.isoformat(), _add_months(month, 1).isoformat()]
+    cursor.execute('SELECT to_regclass(%s) IS NOT NULL', [default])
+    has_default = cursor.fetchone()[0]
+    if has_default:
+        moved = f'{table}_moved'
+        # No new rows may land in the DEFAULT partition until the partition exists
+        cursor.execute(f'LOCK TABLE {qn(default)} IN EXCLUSIVE MODE')
+        cursor.execute(f'CREATE TEMP TABLE {qn(moved)} (LIKE {qn(table)})')
+        cursor.execute(
+            f'WITH late AS (DELETE FROM {qn(default)} WHERE created_at >= %s AND created_at < %s RETURNING *) '
+            f'INSERT INTO {qn(moved)} SELECT * FROM late',
+            bounds,
+        )
+    cursor.execute(
+        f'CREATE TABLE IF NOT EXISTS {qn(_partition_name(month))} '
+        f'PARTITION OF {qn(table)} FOR VALUES FROM (%s) TO (%s)',
+        bounds,
+    )
+    if has_default:
+        cursor.execute(f'INSERT INTO {qn(table)} SELECT * FROM {qn(moved)}')
+        cursor.execute(f'DROP TABLE {qn(moved)}')
+
+
+def ensure_partitions(months_ahead=None, start=None):
+    """Create monthly partitions from `start` (default: this month) up to `months_ahead` months out."""
+    months_ahead = settings.NOTIFICATION_PARTITION_MONTHS_AHEAD if months_ahead is None else months_ahead
+    first = _month_start(start or timezone.now())
+    last = _add_months(_month_start(timezone.now()), months_ahead)
+    existing = list_partitions()
+    created = []
+    with connection.cursor() as cursor:
+        month = first
+        while month <= last:
+            if month not in existing:
+                # Moving rows out of the DEFAULT partition and creating the partition commit together
+                with transaction.atomic():
+                    _create_partition(cursor, month)
+                created.append(_partition_name(month))
+            month = _add_months(month, 1)
+    return created
+
+
+def detach_expired_partitions(retention_months=None, drop=False):
+    """
+    Detach monthly partitions that end before the retention window.
+
+    Detached tables keep their rows (for archiving) unless `drop` is set.
+    Unlike `prune_read_notifications`, this removes unread rows as well.
+    """
+    retention_months = (
+        settings.NOTIFICATION_PARTITION_RETENTION_MONTHS if retention_months is None else retention_months
+    )
+    cutoff = _add_months(_month_start(timezone.now()), -retention_months)
+    qn = connection.ops.quote_name
+    detached = []
+    with connection.cursor() as cursor:
+        for month, name in sorted(list_partitions().items()):
+            if _add_months(month, 1) > cutoff:
+                continue
+            cursor.execute(f'ALTER TABLE {qn(_table())} DETACH PARTITION {qn(name)}')
+            if drop:
+                cursor.execute(f'DROP TABLE {qn(name)}')
+            detached.append(name)
+    return detached
+
+
+def maintain_partitions(months_ahead=None, retention_months=None, drop=False):
+    return ensure_partitions(months_ahead), detach_expired_partitions(retention_months, drop=drop)
+
+
+@transaction.atomic
+def convert_to_partitioned(months_ahead=None):
+    """
+    Rebuild the notification table as a table partitioned by month on created_at.
+
+    PostgreSQL requires the partition key in the primary key, so the new
+    table's key is (id, created_at); ids keep coming from a sequence owned by
+    the new table. Existing rows are copied into their monthly partitions and
+    a DEFAULT partition catches anything outside the created ranges.
+    """
+    if not partitioning_supported():
+        raise RuntimeError('Notification partitioning requires PostgreSQL.')
+    if is_partitioned():
+        return False
+
+    table = _table()
+    legacy = f'{table}_legacy'
+    # The identity sequence of the old table is dropped along with it.
+    sequence = f'{table}_part_id_seq'
+    qn = connection.ops.quote_name
+    columns = ', '.join(qn(f.column) for f in Notification._meta.concrete_fields)
+
+    with connection.cursor() as cursor:
+        cursor.execute(f'LOCK TABLE {qn(table)} IN ACCESS EXCLUSIVE MODE')
+        cursor.execute(
+            "SELECT indexdef FROM pg_indexes WHERE tablename = %s AND schemaname = current_schema() "
+            "AND indexname NOT IN (SELECT conname FROM pg_constraint WHERE contype IN ('p', 'u'))",
+            [table],
+        )
+        index_defs = [row[0] for row in cursor.fetchall()]
+        cursor.execute(
+            'SELECT pg_get_constraintdef(oid) FROM pg_constraint '
+            "WHERE conrelid = %s::regclass AND contype = 'f'",
+            [table],
+        )
+        foreign_keys = [row[0] for row in cursor.fetchall()]
+        cursor.execute(f'SELECT min(created_at), coalesce(max(id), 0) FROM {qn(table)}')
+        oldest, max_id = cursor.fetchone()
+
+        cursor.execute(f'ALTER TABLE {qn(table)} RENAME TO {qn(legacy)}')
+        cursor.execute(
+            f'CREATE TABLE {qn(table)} (LIKE {qn(legacy)} INCLUDING DEFAULTS INCLUDING STORAGE) '
+            f'PARTITION BY RANGE (created_at)'
+        )
+        cursor.execute(f'ALTER TABLE {qn(table)} ALTER COLUMN id DROP IDENTITY IF EXISTS')
+        cursor.execute(f'CREATE SEQUENCE IF NOT EXISTS {qn(sequence)} OWNED BY {qn(table)}.id')
+        cursor.execute('SELECT setval(%s, %s, false)', [sequence, max_id + 1])
+        cursor.execute(f"ALTER TABLE {qn(table)} ALTER COLUMN id SET DEFAULT nextval('{sequence}')")
+        cursor.execute(
+            f'ALTER TABLE {qn(table)} ADD CONSTRAINT {qn(table + "_part_pkey")} PRIMARY KEY (id, created_at)'
+        )
+        for definition in foreign_keys:
+            cursor.execute(f'ALTER TABLE {qn(table)} ADD {definition}')
+        cursor.execute(f'CREATE TABLE {qn(table + "_default")} PARTITION OF {qn(table)} DEFAULT')
+
+    ensure_partitions(months_ahead, start=oldest)
+
+    with connection.cursor() as cursor:
+        cursor.execute(f'INSERT INTO {qn(table)} ({columns}) SELECT {columns} FROM {qn(legacy)}')
+        cursor.execute(f'DROP TABLE {qn(legacy)}')
+        # Index definitions were read before the rename, so they already
+        # target the new table and reuse the original index names.
+        for definition in index_defs:
+            cursor.execute(definition)
+    return True
@@ -0,0 +1,196 @@
+"""
+Interview availability search.
+
+Busy time is fetched per interviewer and per room with indexed range scans
+on (interviewer, start) / (room, start). Because no interview is longer
+than INTERVIEW_MAX_MINUTES, "overlaps the window" can be written as a
+bounded range on start, which those indexes answer directly. Everything
+after that is sorted sweeps over (start, end) pairs in epoch seconds:
+merge all busy intervals into one sorted union, take its complement within
+working hours, then intersect with each room's free time. Each step is
+linear after one sort, instead of checking pairs of intervals.
+"""
+import heapq
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+
+import numpy as np
+from django.conf import settings
+from django.db.models import FloatField, Q
+from django.db.models.functions import Cast, Extract
+
+from .models import Interview, InterviewAssignment
+
+
+def merge_intervals(intervals):
+    """Union of (start, end) intervals, a sequence or an (n, 2) array, as a sorted list of disjoint intervals."""
+    spans = np.asarray(intervals, dtype=np.float64).reshape(-1, 2)
+    if not len(spans):
+        return []
+    spans = spans[np.argsort(spans[:, 0], kind='stable')]
+    # A new block starts wherever a start lies beyond every earlier end
+    reach = np.maximum.accumulate(spans[:, 1])
+    breaks = np.flatnonzero(spans[1:, 0] > reach[:-1]) + 1
+    starts = spans[np.concatenate([[0], breaks]), 0]
+    ends = reach[np.concatenate([breaks - 1, [len(spans) - 1]])]
+    return list(zip(starts.tolist(), ends.tolist()))
+
+
+def complement(busy, start, end):
+    """Free intervals inside [start, end) given sorted, disjoint busy intervals."""
+    free = []
+    cursor = start
+    for busy_start, busy_end in busy:
+        if busy_end <= cursor:
+            continue
+        if busy_start >= end:
+            break
+        if busy_start > cursor:
+            free.append((cursor, busy_start))
+        cursor = max(cursor, busy_end)
+    if cursor < end:
+        free.append((cursor, end))
+    return free
+
+
+def intersect(a, b):
+    """Intersection of two sorted lists of disjoint intervals (two-pointer sweep)."""
+    result = []
+    i = j = 0
+    while i < len(a) and j < len(b):
+        start = max(a[i][0], b[j][0])
+        end = min(a[i][1], b[j][1])
+        if start < end:
+            result.append((start, end))
+        if a[i][1] < b[j][1]:
+            i += 1
+        else:
+            j += 1
+    return result
+
+
+def working_hours(start, end, day_start, day_end, tz, weekends=False):
+    """Daily [day_start, day_end) hour windows between two aware datetimes, in epoch seconds."""
+    windows = []
+    day = start.astimezone(tz).date()
+    last = end.astimezone(tz).date()
+    while day <= last:
+        if weekends or day.weekday() < 5:
+            # Wall-clock hours, not offsets from midnight, so DST change days keep 9-17
+            open_at = datetime.combine(day, time(day_start), tz).timestamp()
+            if day_end == 24:
+                close_at = datetime.combine(day + timedelta(days=1), time(0), tz).timestamp()
+            else:
+                close_at = datetime.combine(day, time(day_end), tz).timestamp()
+            windows.append((max(open_at, start.timestamp()), min(close_at, end.timestamp())))
+        day += timedelta(days=1)
+    return [(s, e) for s, e in windows if s < e]
+
+
+def _epoch(field):
+    return Cast(Extract(field, 'epoch', tzinfo=dt_timezone.utc), FloatField())
+
+
+def _busy_rows(queryset, start, end, *keys):
+    """
+    Busy rows overlapping [start, end), found via a bounded index range on
+    start, as an (n, len(keys) + 2) float array of keys, start and end.
+
+    The database converts the times to epoch seconds, so the rows go straight
+    into numpy without building a datetime object per value.
+    """
+    earliest = start - timedelta(minutes=settings.INTERVIEW_MAX_MINUTES)
+    rows = queryset.filter(start__gte=earliest, start__lt=end, end__gt=start).order_by().values_list(
+        *keys, _epoch('start'), _epoch('end'),
+    )
+    return np.array(list(rows), dtype=np.float64).reshape(-1, len(keys) + 2)
+
+
+def interviewer_busy(interviewer_ids, start, end):
+    """Busy (start, end) epoch seconds of all the interviewers, as an (n, 2) array."""
+    return _busy_rows(
+        InterviewAssignment.objects.filter(interviewer_id__in=interviewer_ids)
+        .exclude(interview__status__in=Interview.INACTIVE_STATUSES),
+        start, end,
+    )
+
+
+def room_busy(room_ids, start, end):
+    rows = _busy_rows(
+        Interview.objects.filter(room_id__in=room_ids).exclude(status__in=Interview.INACTIVE_STATUSES),
+        start, end, 'room_id',
+    )
+    return {room_id: merge_intervals(rows[rows[:, 0] == room_id, 1:]) for room_id in room_ids}
+
+
+def _slots(free, duration, step, limit, room_id=None):
+    """Yield (start, end, room) slots of `duration` seconds inside free intervals, earliest first."""
+    count = 0
+    for free_start, free_end in free:
+        slot = free_start
+        while slot + duration <= free_end and count < limit:
+            yield slot, slot + duration, room_id
+            count += 1
+            slot += step
+        if count >= limit:
+            return
+
+
+def find_slots(interviewer_ids, start, end, duration, room_ids=None, step=None, limit=10,
+               day_start=9, day_end=17, tz=None, weekends=False):
+    """
+    Earliest slots of `duration` in [start, end) when every interviewer is free
+    and, if `room_ids` is given, at least one of those rooms is free as well.
+
+    Returns a list of {'start', 'end', 'room'} dicts in chronological order.
+    """
+    tz = tz or dt_timezone.utc
+    seconds = int(duration.total_seconds())
+    step = int(step.total_seconds()) if step else seconds
+
+    free = working_hours(start, end, day_start, day_end, tz, weekends)
+    if interviewer_ids:
+        busy = merge_intervals(interviewer_busy(interviewer_ids, start, end))
+        free = intersect(free, complement(busy, start.timestamp(), end.timestamp()))
+
+    if room_ids:
+        rooms = room_busy(room_ids, start, end)
+        # Each room's slots are already sorted, so a heap merge keeps the earliest first
+        streams = [
+            _slots(intersect(free, complement(busy, start.timestamp(), end.timestamp())), seconds, step, limit, room_id)
+            for room_id, busy in rooms.items()
+        ]
+        slots = []
+        seen = set()
+        for slot in heapq.merge(*streams):
+            if slot[0] not in seen:
+                seen.add(slot[0])
+                slots.append(slot)
+            if len(slots) >= limit:
+                break
+    else:
+        slots = list(_slots(free, seconds, step, limit))
+
+    return [
+        {
+            'start': datetime.fromtimestamp(s, dt_timezone.utc),
+            'end': datetime.fromtimestamp(e, dt_timezone.utc),
+            'room': room_id,
+        }
+        for s, e, room_id in slots
+    ]
+
+
+def find_conflicts(interviewer_ids, room_id, start, end, exclude_interview=None):
+    """Active interviews that overlap [start, end) for any of the interviewers or the room."""
+    overlapping = Q(interviewers__id__in=interviewer_ids)
+    if room_id:
+        overlapping |= Q(room_id=room_id)
+    conflicts = Interview.objects.filter(
+        overlapping,
+        start__gte=start - timedelta(minutes=settings.INTERVIEW_MAX_MINUTES),
+        start__lt=end,
+        end__gt=start,
+    ).exclude(status__in=Interview.INACTIVE_STATUSES)
+    if exclude_interview is not None:
+        conflicts = conflicts.exclude(pk=exclude_interview)
+    return conflicts.distinct()
@@ -1,14 +1,25 @@
+from datetime import timedelta
 from rest_framework import serializers
+from django.conf import settings
 from django.contrib.auth.models import User
-from .models import Candidate, JobOpening, Application, UserProfile, Notification
+from django.db import transaction
+from .models import (
+    Candidate, JobOpening, Application, UserProfile, Notification, Recommendation,
+    Room, Interview, InterviewAssignment, ImportJob, DuplicateCandidatePair
+)
+from .permissions import scope_by_department
+from .scheduling import find_conflicts
 
 class UserProfileSerializer(serializers.ModelSerializer):
     username = serializers.CharField(source='user.username', read_only=True)
     email = serializers.CharField(source='user.email', read_only=True)
+    departments = serializers.SlugRelatedField(
+        source='department_assignments', slug_field='department', many=True, read_only=True
+    )
     
     class Meta:
         model = UserProfile
-        fields = ['id', 'username', 'email', 'role', 'candidate']
+        fields = ['id', 'username', 'email', 'role', 'candidate', 'departments']
 
 class CandidateSerializer(serializers.ModelSerializer):
     resume_url = serializers.SerializerMethodField()
@@ -16,6 +27,7 @@ class CandidateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Candidate
         fields = '__all__'
+        read_only_fields = ['resume_file']
     
     def get_resume_url(self, obj):
         if obj.resume:
@@ -26,9 +38,16 @@ class CandidateSerializer(serializers.ModelSerializer):
         return None
 
 class JobOpeningSerializer(serializers.ModelSerializer):
+    # Computed from the row's own counters, so listing jobs stays one query
+    positions_remaining = serializers.SerializerMethodField()
+    
     class Meta:
         model = JobOpening
         fields = '__all__'
+        read_only_fields = JobOpening.COUNTER_FIELDS
+    
+    def get_positions_remaining(self, obj):
+        return max(obj.positions - obj.offer_extended_count, 0)
 
 class ApplicationSerializer(serializers.ModelSerializer):
     # Send readable names to the frontend
@@ -51,3 +70,141 @@ class NotificationSerializer(serializers.ModelSerializer):
     class Meta:
         model = Notification
         fields = ['id', 'type', 'title', 'message', 'job', 'job_title', 'application', 'is_read', 'created_at']
+
+class JobRecommendationSerializer(serializers.ModelSerializer):
+    job = JobOpeningSerializer(read_only=True)
+    
+    class Meta:
+        model = Recommendation
+        fields = ['score', 'job']
+
+class CandidateMatchSerializer(serializers.ModelSerializer):
+    candidate_id = serializers.IntegerField(source='candidate.id', read_only=True)
+    candidate_name = serializers.CharField(source='candidate.__str__', read_only=True)
+    email = serializers.CharField(source='candidate.email', read_only=True)
+    
+    class Meta:
+        model = Recommendation
+        fields = ['score', 'candidate_id', 'candidate_name', 'email']
+
+class RoomSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Room
+        fields = '__all__'
+
+class DuplicateCandidatePairSerializer(serializers.ModelSerializer):
+    candidate_a = CandidateSerializer(read_only=True)
+    candidate_b = CandidateSerializer(read_only=True)
+    
+    class Meta:
+        model = DuplicateCandidatePair
+        fields = ['id', 'candidate_a', 'candidate_b', 'score', 'reasons', 'status', 'created_at']
+
+class ImportJobSerializer(serializers.ModelSerializer):
+    progress = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = ImportJob
+        fields = [
+            'id', 'original_name', 'format', 'status', 'progress', 'total_rows', 'processed_rows',
+            'candidates_created', 'candidates_updated', 'applications_created', 'error_count',
+            'message', 'created_at', 'finished_at',
+        ]
+    
+    def get_progress(self, obj):
+        if obj.status == 'DONE':
+            return 100
+        return round(100 * obj.processed_rows / obj.total_rows) if obj.total_rows else 0
+
+class ImportJobDetailSerializer(ImportJobSerializer):
+    # The row error report is only sent when polling a single import
+    class Meta(ImportJobSerializer.Meta):
+        fields = ImportJobSerializer.Meta.fields + ['errors']
+
+class InterviewSerializer(serializers.ModelSerializer):
+    interviewers = serializers.PrimaryKeyRelatedField(many=True, queryset=User.objects.all())
+    candidateName = serializers.CharField(source='application.candidate.__str__', read_only=True)
+    candidateEmail = serializers.CharField(source='application.candidate.email', read_only=True)
+    jobTitle = serializers.CharField(source='application.job.title', read_only=True)
+    department = serializers.CharField(source='application.job.department', read_only=True)
+    interviewer_names = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = Interview
+        fields = [
+            'id', 'application', 'interviewers', 'room', 'start', 'end', 'type', 'status',
+            'meetingLink', 'notes', 'candidateName', 'candidateEmail', 'jobTitle', 'department',
+            'interviewer_names',
+        ]
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request is not None:
+            # Managers can only schedule interviews for their departments' applications
+            self.fields['application'].queryset = scope_by_department(
+                Application.objects.all(), request, 'job__department'
+            )
+    
+    def get_interviewer_names(self, obj):
+        return [user.get_full_name() or user.username for user in obj.interviewers.all()]
+    
+    def validate(self, attrs):
+        instance = self.instance
+        start = attrs.get('start', instance.start if instance else None)
+        end = attrs.get('end', instance.end if instance else None)
+        if end <= start:
+            raise serializers.ValidationError({'end': 'End must be after start.'})
+        if end - start > timedelta(minutes=settings.INTERVIEW_MAX_MINUTES):
+            raise serializers.ValidationError({'end': f'Interviews cannot be longer than {settings.INTERVIEW_MAX_MINUTES} minutes.'})
+        if 'interviewers' in attrs and not attrs['interviewers']:
+            raise serializers.ValidationError({'interviewers': 'At least one interviewer is required.'})
+        return attrs
+    
+    def _check_conflicts(self, interview, interviewer_ids, room, start, end, status):
+        if status in Interview.INACTIVE_STATUSES:
+            return
+        # Lock the interviewers, then the room, so two bookings for the same person or room serialize
+        list(User.objects.select_for_update().filter(id__in=interviewer_ids).order_by('id').values_list('id', flat=True))
+        if room:
+            list(Room.objects.select_for_update().filter(pk=room.id).values_list('id', flat=True))
+        conflicts = find_conflicts(interviewer_ids, room.id if room else None, start, end,
+                                   exclude_interview=interview.pk if interview else None)
+        if conflicts.exists():
+            raise serializers.ValidationError({
+                'conflicts': [
+                    {'id': c.id, 'start': c.start, 'end': c.end, 'room': c.room_id}
+                    for c in conflicts[:10]
+                ]
+            })
+    
+    @transaction.atomic
+    def create(self, validated_data):
+        interviewers = validated_data.pop('interviewers')
+        self._check_conflicts(None, [u.id for u in interviewers], validated_data.get('room'),
+                              validated_data['start'], validated_data['end'], validated_data.get('status'))
+        interview = Interview.objects.create(**validated_data)
+        InterviewAssignment.objects.bulk_create([
+            InterviewAssignment(interview=interview, interviewer=user, start=interview.start, end=interview.end)
+            for user in interviewers
+        ])
+        return interview
+    
+    @transaction.atomic
+    def update(self, instance, validated_data):
+        interviewers = validated_data.pop('interviewers', None)
+        interviewer_ids = [u.id for u in interviewers] if interviewers is not None else \
+            list(instance.assignments.values_list('interviewer_id', flat=True))
+        for field, value in validated_data.items():
+            setattr(instance, field, value)
+        self._check_conflicts(instance, interviewer_ids, instance.room, instance.start, instance.end, instance.status)
+        instance.save()
+        if interviewers is not None:
+            instance.assignments.all().delete()
+            InterviewAssignment.objects.bulk_create([
+                InterviewAssignment(interview=instance, interviewer_id=user_id, start=instance.start, end=instance.end)
+                for user_id in interviewer_ids
+            ])
+        else:
+            instance.assignments.update(start=instance.start, end=instance.end)
+        return instance
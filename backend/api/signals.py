@@ -0,0 +1,24 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from .models import Candidate, JobOpening
+from .tasks import refresh_candidate_matches, refresh_job_matches
+
+CANDIDATE_MATCH_FIELDS = {'bio', 'resume_file'}
+JOB_MATCH_FIELDS = {'title', 'description', 'department'}
+
+
+def _touches(update_fields, fields):
+    return update_fields is None or bool(fields & set(update_fields))
+
+
+@receiver(post_save, sender=Candidate)
+def refresh_candidate_on_save(sender, instance, update_fields=None, raw=False, **kwargs):
+    # The task skips the work when the matched text did not actually change
+    if not raw and _touches(update_fields, CANDIDATE_MATCH_FIELDS):
+        refresh_candidate_matches.delay(instance.pk)
+
+
+@receiver(post_save, sender=JobOpening)
+def refresh_job_on_save(sender, instance, update_fields=None, raw=False, **kwargs):
+    if not raw and _touches(update_fields, JOB_MATCH_FIELDS):
+        refresh_job_matches.delay(instance.pk)
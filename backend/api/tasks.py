@@ -0,0 +1,101 @@
+from django.contrib.auth.models import User
+from .models import JobOpening, Application, Notification, Candidate, Interview, UserProfile
+from .queue import task
+from .resumes import index_resume_text
+from . import imports, matching
+
+NOTIFICATION_BATCH_SIZE = 1000
+
+
+@task
+def notify_new_job(job_id):
+    """Create a NEW_JOB notification for every candidate user."""
+    job = JobOpening.objects.filter(pk=job_id).first()
+    if job is None:
+        return
+    # Skip users that already have one so a retried task does not duplicate
+    candidate_ids = (
+        User.objects.filter(profile__role='CANDIDATE')
+        .exclude(notifications__job=job, notifications__type='NEW_JOB')
+        .values_list('id', flat=True)
+        .iterator(chunk_size=NOTIFICATION_BATCH_SIZE)
+    )
+    batch = []
+    for user_id in candidate_ids:
+        batch.append(Notification(
+            user_id=user_id,
+            type='NEW_JOB',
+            title=f'New Job Posting: {job.title}',
+            message=f'A new {job.department} position has been posted: {job.title}',
+            job=job
+        ))
+        if len(batch) >= NOTIFICATION_BATCH_SIZE:
+            Notification.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        Notification.objects.bulk_create(batch)
+
+
+@task
+def notify_application_submitted(application_id, user_id):
+    application = Application.objects.select_related('job').filter(pk=application_id).first()
+    if application is None:
+        return
+    Notification.objects.get_or_create(
+        user_id=user_id,
+        type='APPLICATION_UPDATE',
+        application=application,
+        defaults={
+            'title': 'Application Submitted',
+            'message': f'Your application for {application.job.title} has been received',
+        }
+    )
+
+
+@task
+def notify_interview_scheduled(interview_id):
+    interview = Interview.objects.select_related('application__job').filter(pk=interview_id).first()
+    if interview is None:
+        return
+    user_ids = UserProfile.objects.filter(candidate_id=interview.application.candidate_id).values_list('user_id', flat=True)
+    for user_id in user_ids:
+        Notification.objects.get_or_create(
+            user_id=user_id,
+            type='INTERVIEW',
+            application=interview.application,
+            title='Interview Scheduled',
+            defaults={
+                'message': f'Your interview for {interview.application.job.title} is scheduled for '
+                           f'{interview.start:%Y-%m-%d %H:%M} UTC',
+            }
+        )
+
+
+@task
+def extract_resume_text(resume_file_id):
+    index_resume_text(resume_file_id)
+    # The extracted text feeds the candidates' match vectors
+    for candidate_id in Candidate.objects.filter(resume_file_id=resume_file_id).values_list('id', flat=True):
+        refresh_candidate_matches.delay(candidate_id)
+
+
+@task
+def refresh_candidate_matches(candidate_id):
+    matching.refresh_candidate(candidate_id)
+
+
+@task
+def refresh_candidates_matches(candidate_ids):
+    """Refresh many candidates' matches in one task, for bulk writes that skip the signals."""
+    for candidate_id in candidate_ids:
+        matching.refresh_candidate(candidate_id)
+
+
+@task
+def refresh_job_matches(job_id):
+    matching.refresh_job(job_id)
+
+
+@task
+def run_import(import_job_id):
+    imports.run_import(import_job_id)
@@ -0,0 +1,444 @@
+import os
+import tempfile
+from datetime import datetime, timedelta
+from unittest import mock
+from zoneinfo import ZoneInfo
+
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from . import imports, matching
+from .counters import count_applications
+from .models import (
+    Application, Candidate, DepartmentAssignment, DuplicateCandidatePair, ImportJob, Interview, InterviewAssignment,
+    JobOpening, Notification, Recommendation, Room, Task,
+)
+from .queue import claim_tasks, enqueue, requeue_stale_tasks, run_task
+from .reports import build_snapshot
+from .scheduling import working_hours
+from .serializers import JobOpeningSerializer
+
+
+def make_user(username, role='CANDIDATE', candidate=None):
+    user = User.objects.create_user(username=username, password='password')
+    profile = user.profile
+    profile.role = role
+    profile.candidate = candidate
+    profile.save()
+    # The post_save profile handler re-saves the cached profile; drop it so it is reloaded
+    user = User.objects.get(pk=user.pk)
+    return user
+
+
+def make_candidate(name, **fields):
+    return Candidate.objects.create(fName=name, lName='Test', email=f'{name.lower()}@example.com', **fields)
+
+
+class JobCounterTests(APITestCase):
+    def setUp(self):
+        self.job = JobOpening.objects.create(title='Data Engineer', department='Data Science')
+        self.hr = make_user('hr', role='HR')
+
+    def test_job_save_keeps_concurrent_counter_updates(self):
+        stale = JobOpening.objects.get(pk=self.job.pk)
+        Application.objects.create(candidate=make_candidate('Ada'), job=self.job, status='Interview')
+        stale.title = 'Senior Data Engineer'
+        stale.save()
+
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.title, 'Senior Data Engineer')
+        self.assertEqual(self.job.applications_count, 1)
+        self.assertEqual(self.job.interview_count, 1)
+
+    def test_patch_interleaved_with_application_keeps_counters(self):
+        update = JobOpeningSerializer.update
+
+        def update_after_application(serializer, instance, validated_data):
+            # The instance is already loaded when another request adds an application
+            Application.objects.create(candidate=make_candidate('Grace'), job=instance)
+            return update(serializer, instance, validated_data)
+
+        self.client.force_authenticate(self.hr)
+        with mock.patch.object(JobOpeningSerializer, 'update', update_after_application):
+            response = self.client.patch(f'/api/jobs/{self.job.pk}/', {'positions': 3}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.positions, 3)
+        self.assertEqual(self.job.applications_count, 1)
+        self.assertEqual(self.job.received_count, 1)
+
+    def test_counters_are_read_only(self):
+        self.client.force_authenticate(self.hr)
+        self.client.patch(f'/api/jobs/{self.job.pk}/', {'applications_count': 99}, format='json')
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.applications_count, 0)
+
+
+class InterviewPermissionTests(APITestCase):
+    def setUp(self):
+        self.candidate = make_candidate('Ada')
+        self.candidate_user = make_user('ada', candidate=self.candidate)
+        self.hr = make_user('hr', role='HR')
+        job = JobOpening.objects.create(title='Data Engineer', department='Data Science')
+        application = Application.objects.create(candidate=self.candidate, job=job)
+        start = timezone.now() + timedelta(days=1)
+        self.interview = Interview.objects.create(application=application, start=start, end=start + timedelta(hours=1))
+        InterviewAssignment.objects.create(
+            interview=self.interview, interviewer=self.hr, start=self.interview.start, end=self.interview.end,
+        )
+        self.url = f'/api/interviews/{self.interview.pk}/'
+
+    def test_candidate_cannot_reschedule_or_delete_own_interview(self):
+        self.client.force_authenticate(self.candidate_user)
+        later = (self.interview.start + timedelta(days=1)).isoformat()
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+        self.assertEqual(self.client.patch(self.url, {'start': later}, format='json').status_code, 403)
+        self.assertEqual(self.client.put(self.url, {'start': later}, format='json').status_code, 403)
+        self.assertEqual(self.client.delete(self.url).status_code, 403)
+        self.assertTrue(Interview.objects.filter(pk=self.interview.pk, start=self.interview.start).exists())
+
+    def test_recruiter_can_reschedule(self):
+        self.client.force_authenticate(self.hr)
+        response = self.client.patch(self.url, {'meetingLink': 'https://meet.example.com/x'}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+    def test_rooms_are_read_only_for_candidates(self):
+        room = Room.objects.create(name='Board room')
+        self.client.force_authenticate(self.candidate_user)
+        self.assertEqual(self.client.get('/api/rooms/').status_code, 200)
+        self.assertEqual(self.client.post('/api/rooms/', {'name': 'Mine'}, format='json').status_code, 403)
+        self.assertEqual(self.client.patch(f'/api/rooms/{room.pk}/', {'name': 'Renamed'}, format='json').status_code, 403)
+        self.assertEqual(self.client.delete(f'/api/rooms/{room.pk}/').status_code, 403)
+
+        self.client.force_authenticate(self.hr)
+        self.assertEqual(self.client.post('/api/rooms/', {'name': 'Lab'}, format='json').status_code, 201)
+        self.assertEqual(self.client.delete(f'/api/rooms/{room.pk}/').status_code, 204)
+
+    def test_impossible_availability_date_is_a_bad_request(self):
+        self.client.force_authenticate(self.hr)
+        response = self.client.get(f'/api/interviews/availability/?interviewers={self.hr.pk}&start=2026-02-30T10:00:00')
+        self.assertEqual(response.status_code, 400)
+
+
+class MergeTests(APITestCase):
+    def setUp(self):
+        self.job = JobOpening.objects.create(title='Data Engineer', department='Data Science')
+        self.keep = make_candidate('Ada')
+        self.duplicate = Candidate.objects.create(fName='Ada', lName='Test', email='ada.test@example.com', phone='555-0100')
+        self.pair = DuplicateCandidatePair.objects.create(candidate_a=self.keep, candidate_b=self.duplicate, score=0.9)
+        self.client.force_authenticate(make_user('hr', role='HR'))
+
+    def merge(self):
+        response = self.client.post(f'/api/duplicates/{self.pair.pk}/merge/', {'keep': self.keep.pk}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+    def test_merge_keeps_most_advanced_application_and_its_children(self):
+        Application.objects.create(candidate=self.keep, job=self.job, status='Received')
+        advanced = Application.objects.create(candidate=self.duplicate, job=self.job, status='Interview')
+        start = timezone.now() + timedelta(days=1)
+        interview = Interview.objects.create(application=advanced, start=start, end=start + timedelta(hours=1))
+        user = make_user('ada', candidate=self.duplicate)
+        notification = Notification.objects.create(
+            user=user, type='INTERVIEW', title='Interview Scheduled', message='Soon', application=advanced,
+        )
+        self.merge()
+
+        application, = Application.objects.filter(job=self.job)
+        self.assertEqual((application.pk, application.candidate_id), (advanced.pk, self.keep.pk))
+        interview.refresh_from_db()
+        notification.refresh_from_db()
+        self.assertEqual(interview.application_id, advanced.pk)
+        self.assertEqual(notification.application_id, advanced.pk)
+        self.assertFalse(Candidate.objects.filter(pk=self.duplicate.pk).exists())
+        self.keep.refresh_from_db()
+        self.assertEqual(self.keep.phone, '555-0100')
+        self.job.refresh_from_db()
+        self.assertEqual(
+            {field: getattr(self.job, field) for field in JobOpening.COUNTER_FIELDS},
+            count_applications([self.job.pk])[self.job.pk],
+        )
+
+    def test_merge_prefers_the_kept_candidates_application_on_a_tie(self):
+        kept = Application.objects.create(candidate=self.keep, job=self.job, status='Under Review')
+        other = Application.objects.create(candidate=self.duplicate, job=self.job, status='Under Review')
+        start = timezone.now() + timedelta(days=1)
+        interview = Interview.objects.create(application=other, start=start, end=start + timedelta(hours=1))
+        self.merge()
+
+        self.assertEqual(list(Application.objects.filter(job=self.job).values_list('pk', flat=True)), [kept.pk])
+        interview.refresh_from_db()
+        self.assertEqual(interview.application_id, kept.pk)
+
+
+class BatchEndpointTests(APITestCase):
+    def setUp(self):
+        self.job = JobOpening.objects.create(title='Data Engineer', department='Data Science')
+        self.hr = make_user('hr', role='HR')
+        self.client.force_authenticate(self.hr)
+
+    def test_batch_get_reports_missing_ids(self):
+        candidate = make_candidate('Ada')
+        response = self.client.get(f'/api/candidates/batch/?ids={candidate.pk},999999,{candidate.pk}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([c['id'] for c in response.data['results']], [candidate.pk])
+        self.assertEqual(response.data['missing'], [999999])
+
+    def test_mark_read_batch_reports_not_found(self):
+        unread = Notification.objects.create(user=self.hr, type='NEW_JOB', title='New', message='New job')
+        read = Notification.objects.create(user=self.hr, type='NEW_JOB', title='Old', message='Old job', is_read=True)
+        others = Notification.objects.create(user=make_user('ada'), type='NEW_JOB', title='New', message='New job')
+
+        response = self.client.post(
+            '/api/notifications/mark_read_batch/', {'ids': [unread.pk, read.pk, others.pk]}, format='json',
+        )
+        self.assertEqual(response.data['marked'], 1)
+        self.assertEqual(
+            [r['result'] for r in response.data['results']], ['marked', 'already_read', 'not_found'],
+        )
+        others.refresh_from_db()
+        self.assertFalse(others.is_read)
+
+    def test_non_object_bodies_are_bad_requests(self):
+        for url in ('/api/applications/withdraw_batch/', '/api/notifications/mark_read_batch/'):
+            response = self.client.post(url, [1, 2], format='json')
+            self.assertEqual(response.status_code, 400, url)
+
+    def test_withdraw_batch_moves_job_counters(self):
+        received = Application.objects.create(candidate=make_candidate('Ada'), job=self.job)
+        interview = Application.objects.create(candidate=make_candidate('Grace'), job=self.job, status='Interview')
+        withdrawn = Application.objects.create(candidate=make_candidate('Alan'), job=self.job, status='Withdrawn')
+
+        response = self.client.post(
+            '/api/applications/withdraw_batch/',
+            {'ids': [received.pk, interview.pk, withdrawn.pk, 999999]},
+            format='json',
+        )
+        self.assertEqual(response.data['withdrawn'], 2)
+        self.assertEqual(
+            [r['result'] for r in response.data['results']],
+            ['withdrawn', 'withdrawn', 'already_withdrawn', 'not_found'],
+        )
+        self.job.refresh_from_db()
+        counters = {field: getattr(self.job, field) for field in JobOpening.COUNTER_FIELDS}
+        self.assertEqual(counters, count_applications([self.job.pk])[self.job.pk])
+        self.assertEqual((counters['withdrawn_count'], counters['interview_count']), (3, 0))
+
+
+class DepartmentScopeTests(APITestCase):
+    def setUp(self):
+        self.manager = make_user('manager', role='MANAGER')
+        DepartmentAssignment.objects.create(profile=self.manager.profile, department='Data Science')
+        self.data_job = JobOpening.objects.create(title='Data Engineer', department='Data Science')
+        self.sales_job = JobOpening.objects.create(title='Account Executive', department='Sales')
+        self.inside = make_candidate('Ada')
+        self.outside = make_candidate('Grace')
+        Application.objects.create(candidate=self.inside, job=self.data_job)
+        Application.objects.create(candidate=self.inside, job=self.sales_job)
+        self.outside_application = Application.objects.create(candidate=self.outside, job=self.sales_job)
+        self.client.force_authenticate(self.manager)
+
+    def test_candidate_list_and_batch_are_scoped(self):
+        response = self.client.get('/api/candidates/')
+        data = response.data['results'] if isinstance(response.data, dict) else response.data
+        self.assertEqual([c['id'] for c in data], [self.inside.pk])
+        self.assertEqual(self.client.get(f'/api/candidates/{self.outside.pk}/').status_code, 404)
+
+        response = self.client.get(f'/api/candidates/batch/?ids={self.inside.pk},{self.outside.pk}')
+        self.assertEqual([c['id'] for c in response.data['results']], [self.inside.pk])
+        self.assertEqual(response.data['missing'], [self.outside.pk])
+
+    def test_recommended_jobs_are_scoped(self):
+        Recommendation.objects.create(candidate=self.inside, job=self.data_job, score=0.5)
+        Recommendation.objects.create(candidate=self.inside, job=self.sales_job, score=0.9)
+        Recommendation.objects.create(candidate=self.outside, job=self.data_job, score=0.7)
+
+        response = self.client.get(f'/api/candidates/{self.inside.pk}/recommended_jobs/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 1)
+        self.assertEqual(self.client.get(f'/api/candidates/{self.outside.pk}/recommended_jobs/').status_code, 403)
+
+    def test_cannot_schedule_out_of_scope_application(self):
+        start = timezone.now() + timedelta(days=1)
+        response = self.client.post('/api/interviews/', {
+            'application': self.outside_application.pk,
+            'interviewers': [self.manager.pk],
+            'start': start.isoformat(),
+            'end': (start + timedelta(hours=1)).isoformat(),
+        }, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('application', response.data)
+        self.assertFalse(Interview.objects.exists())
+
+
+@override_settings(MATCHING_TOP_K=2, MATCHING_MIN_SCORE=0.0)
+class MatchingTests(TestCase):
+    def setUp(self):
+        matching.candidate_cache.clear()
+        self.jobs = [
+            JobOpening.objects.create(title=title, department='Engineering', description=description)
+            for title, description in [
+                ('Data Engineer', 'python spark pipelines warehouse'),
+                ('Frontend Developer', 'react typescript css design'),
+                ('Backend Developer', 'python django postgres api'),
+            ]
+        ]
+        self.candidates = [
+            make_candidate(name, bio=bio)
+            for name, bio in [
+                ('Ada', 'python spark warehouse pipelines'),
+                ('Grace', 'react css typescript'),
+                ('Linus', 'python django api postgres'),
+                ('Alan', 'python react django'),
+            ]
+        ]
+        matching.rebuild_recommendations(chunk_size=2, revectorize=True)
+
+    def pairs(self, **filters):
+        return dict(
+            ((c, j), round(score, 5))
+            for c, j, score in Recommendation.objects.filter(**filters).values_list('candidate_id', 'job_id', 'score')
+        )
+
+    def exact_scores(self):
+        index = matching.JobIndex()
+        ids, raw, _ = next(matching._candidate_vector_chunks(100))
+        return ids, index.ids, (index.weigh(raw) @ index.matrix.T).toarray()
+
+    def test_rebuild_keeps_top_k_on_both_sides(self):
+        candidate_ids, job_ids, scores = self.exact_scores()
+        pairs = self.pairs()
+        for row, candidate_id in enumerate(candidate_ids):
+            best = {int(job_ids[j]) for j in matching._top_k(scores[row], 2, 0.0)}
+            self.assertTrue(best <= {j for c, j in pairs if c == candidate_id})
+        for column, job_id in enumerate(job_ids):
+            best = {int(candidate_ids[c]) for c in matching._top_k(scores[:, column], 2, 0.0)}
+            self.assertTrue(best <= {c for c, j in pairs if j == job_id})
+
+    def test_job_refresh_is_the_same_with_and_without_the_cache(self):
+        job = self.jobs[0]
+        job.description = 'python react django'
+        job.save()
+        with override_settings(MATCHING_CANDIDATE_CACHE_SIZE=0):
+            matching.refresh_job(job.pk)
+            streamed = self.pairs(job=job)
+        matching.refresh_job(job.pk, force=True)
+        self.assertEqual(self.pairs(job=job), streamed)
+        self.assertIsNotNone(matching.candidate_cache.built)
+
+    def test_candidate_refresh_prunes_pairs_it_no_longer_has(self):
+        candidate = self.candidates[1]
+        self.assertIn((candidate.pk, self.jobs[1].pk), self.pairs(candidate=candidate))
+        candidate.bio = 'python spark warehouse'
+        candidate.save()
+        matching.refresh_candidate(candidate.pk)
+        pairs = self.pairs(candidate=candidate)
+        self.assertIn((candidate.pk, self.jobs[0].pk), pairs)
+        self.assertNotIn((candidate.pk, self.jobs[1].pk), pairs)
+
+    def test_job_index_is_reused_until_a_job_vector_changes(self):
+        index = matching.job_index()
+        self.assertIs(matching.job_index(), index)
+        job = self.jobs[2]
+        job.title = 'Platform Engineer'
+        job.save()
+        matching.refresh_job(job.pk)
+        self.assertIsNot(matching.job_index(), index)
+
+
+class ReportTests(APITestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        overrides = override_settings(REPORT_SNAPSHOT_DIR=directory.name)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        job = JobOpening.objects.create(title='Data Engineer', department='Data Science')
+        Application.objects.create(candidate=make_candidate('Ada'), job=job)
+        build_snapshot()
+        self.client.force_authenticate(make_user('hr', role='HR'))
+
+    def test_days_window(self):
+        response = self.client.get('/api/reports/summary/?days=30')
+        self.assertEqual(response.status_code, 200)
+
+    def test_huge_days_window_is_a_bad_request(self):
+        response = self.client.get('/api/reports/summary/?days=100000000')
+        self.assertEqual(response.status_code, 400)
+
+
+class ImportTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        overrides = override_settings(MEDIA_ROOT=directory.name)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        self.job = JobOpening.objects.create(title='Data Engineer', department='Data Science')
+
+    def start_import(self):
+        rows = f'fName,lName,email,bio,job\nAda,Lovelace,ada@example.com,python spark,{self.job.pk}\n'
+        import_job = ImportJob(format='csv')
+        import_job.file.save('applicants.csv', ContentFile(rows.encode()))
+        self.path = import_job.file.path
+        imports.run_import(import_job.pk)
+        return ImportJob.objects.get(pk=import_job.pk)
+
+    def test_import_cleans_up_and_refreshes_matches(self):
+        import_job = self.start_import()
+        self.assertEqual(import_job.status, 'DONE')
+        self.assertFalse(import_job.file)
+        self.assertFalse(os.path.exists(self.path))
+        candidate = Candidate.objects.get(email='ada@example.com')
+        task = Task.objects.get(name='api.tasks.refresh_candidates_matches')
+        self.assertEqual(task.args, [[candidate.pk]])
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.applications_count, 1)
+
+    def test_job_deleted_during_import_fails_the_chunk(self):
+        process_chunk = imports.process_chunk
+
+        def delete_job_first(*args):
+            JobOpening.objects.filter(pk=self.job.pk).delete()
+            return process_chunk(*args)
+
+        with mock.patch.object(imports, 'process_chunk', delete_job_first), self.assertLogs('api.imports', 'ERROR'):
+            import_job = self.start_import()
+        self.assertEqual(import_job.status, 'FAILED')
+        self.assertEqual(import_job.message, f'Job {self.job.pk} was deleted during the import')
+        self.assertFalse(Candidate.objects.filter(email='ada@example.com').exists())
+        self.assertFalse(os.path.exists(self.path))
+
+
+class TaskQueueTests(TestCase):
+    def setUp(self):
+        enqueue('api.tasks.refresh_job_matches', 0)
+
+    def test_outcome_is_recorded_by_the_lock_holder(self):
+        t, = claim_tasks('worker-a')
+        self.assertTrue(run_task(t))
+        self.assertEqual(Task.objects.get(pk=t.pk).status, 'DONE')
+
+    def test_outcome_of_a_lost_lease_is_discarded(self):
+        t, = claim_tasks('worker-a')
+        # The heartbeat lapsed and another worker took the task over
+        Task.objects.filter(pk=t.pk).update(locked_at=timezone.now() - timedelta(hours=1))
+        requeue_stale_tasks(timeout=60)
+        claim_tasks('worker-b')
+
+        with self.assertLogs('api.queue', 'WARNING'):
+            self.assertFalse(run_task(t))
+        task = Task.objects.get(pk=t.pk)
+        self.assertEqual((task.status, task.locked_by), ('RUNNING', 'worker-b'))
+
+
+class WorkingHoursTests(SimpleTestCase):
+    def test_dst_change_day_keeps_wall_clock_hours(self):
+        tz = ZoneInfo('America/New_York')
+        start = datetime(2026, 3, 8, tzinfo=tz)
+        (open_at, close_at), = working_hours(start, start + timedelta(days=1), 9, 17, tz, weekends=True)
+        self.assertEqual(datetime.fromtimestamp(open_at, tz).hour, 9)
+        self.assertEqual(datetime.fromtimestamp(close_at, tz).hour, 17)
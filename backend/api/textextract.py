@@ -0,0 +1,62 @@
+"""
+Plain-text extraction for uploaded resumes.
+
+This module is deliberately free of Django imports: it runs inside a
+spawned process pool (see api/resumes.py), where Django is not set up.
+"""
+import html
+import re
+import zipfile
+
+_XML_PARAGRAPH = re.compile(r'</(?:w:p|text:p|text:h)>')
+_XML_TAG = re.compile(r'<[^>]+>')
+_RTF_CONTROL = re.compile(r'\\[a-z]+-?\d* ?|[{}]|\\[^a-z]')
+_WHITESPACE = re.compile(r'[ \t\r\f\v]+')
+_BLANK_LINES = re.compile(r'\n\s*\n+')
+
+
+def _normalize(text, max_chars):
+    text = _WHITESPACE.sub(' ', text)
+    text = _BLANK_LINES.sub('\n\n', text)
+    return text.strip()[:max_chars]
+
+
+def _xml_text(path, member):
+    with zipfile.ZipFile(path) as archive:
+        xml = archive.read(member).decode('utf-8', errors='replace')
+    return html.unescape(_XML_TAG.sub('', _XML_PARAGRAPH.sub('\n', xml)))
+
+
+def _pdf_text(path):
+    from pypdf import PdfReader
+
+    reader = PdfReader(path)
+    return '\n'.join(page.extract_text() or '' for page in reader.pages)
+
+
+def _rtf_text(path):
+    with open(path, 'r', encoding='latin-1') as f:
+        return _RTF_CONTROL.sub('', f.read())
+
+
+def _plain_text(path):
+    with open(path, 'rb') as f:
+        return f.read().decode('utf-8', errors='replace')
+
+
+EXTRACTORS = {
+    '.pdf': _pdf_text,
+    '.docx': lambda path: _xml_text(path, 'word/document.xml'),
+    '.odt': lambda path: _xml_text(path, 'content.xml'),
+    '.rtf': _rtf_text,
+    '.txt': _plain_text,
+    '.md': _plain_text,
+}
+
+
+def extract_text(path, extension, max_chars):
+    """Return the plain text of the file at `path`, or '' for unsupported formats."""
+    extractor = EXTRACTORS.get(extension.lower())
+    if extractor is None:
+        return ''
+    return _normalize(extractor(path), max_chars)
@@ -0,0 +1,115 @@
+import hashlib
+import math
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework.throttling import BaseThrottle
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Token-bucket throttle backed by the Django cache.
+
+    The rate for `scope` is read from REST_FRAMEWORK['DEFAULT_THROTTLE_RATES']
+    in DRF's usual "<requests>/<period>" form: the bucket holds up to
+    <requests> tokens and refills continuously over <period>, so short bursts
+    are allowed while the sustained rate stays bounded. With the default
+    local-memory cache buckets are per process; configure a shared cache
+    (e.g. Redis or the database cache) to enforce them across workers.
+    """
+    scope = None
+    cache = cache
+    timer = time.time
+    cache_format = 'throttle_bucket_%(scope)s_%(ident)s'
+    # A bucket is read and written under a cache lock so concurrent requests cannot spend one token twice
+    lock_timeout = 2
+    lock_wait = 0.5
+
+    def __init__(self):
+        self.capacity, self.refill_rate = self.parse_rate(self.get_rate())
+        self.wait_time = None
+
+    def get_rate(self):
+        rates = settings.REST_FRAMEWORK.get('DEFAULT_THROTTLE_RATES', {})
+        try:
+            return rates[self.scope]
+        except KeyError:
+            raise ImproperlyConfigured(f"No throttle rate set for scope '{self.scope}'")
+
+    def parse_rate(self, rate):
+        num, period = rate.split('/')
+        duration = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}[period[0]]
+        return int(num), int(num) / duration
+
+    def get_ident_for(self, request, view):
+        """Return the identity the bucket is keyed on, or None to skip throttling."""
+        raise NotImplementedError
+
+    def allow_request(self, request, view):
+        ident = self.get_ident_for(request, view)
+        if ident is None:
+            return True
+
+        key = self.cache_format % {'scope': self.scope, 'ident': ident}
+        with self.locked(key) as acquired:
+            if not acquired:
+                # Heavy contention on one bucket is itself a burst; refuse rather than wait
+                self.wait_time = 1 / self.refill_rate
+                return False
+            now = self.timer()
+            tokens, stamp = self.cache.get(key, (self.capacity, now))
+            tokens = min(self.capacity, tokens + (now - stamp) * self.refill_rate)
+
+            if tokens < 1:
+                self.wait_time = (1 - tokens) / self.refill_rate
+                return False
+
+            # Expire the key once a full bucket would have refilled anyway
+            self.cache.set(key, (tokens - 1, now), math.ceil(self.capacity / self.refill_rate))
+            return True
+
+    @contextmanager
+    def locked(self, key):
+        """Hold `<key>_lock` via cache.add, which is atomic on every cache backend; yields whether it was taken."""
+        lock_key = f'{key}_lock'
+        deadline = time.monotonic() + self.lock_wait
+        while not self.cache.add(lock_key, 1, self.lock_timeout):
+            if time.monotonic() >= deadline:
+                yield False
+                return
+            time.sleep(0.005)
+        try:
+            yield True
+        finally:
+            self.cache.delete(lock_key)
+
+    def wait(self):
+        return self.wait_time
+
+
+class LoginIPThrottle(TokenBucketThrottle):
+    scope = 'login_ip'
+
+    def get_ident_for(self, request, view):
+        return self.get_ident(request)
+
+
+class LoginUsernameThrottle(TokenBucketThrottle):
+    scope = 'login_username'
+
+    def get_ident_for(self, request, view):
+        username = request.data.get('username')
+        if not username:
+            return None
+        # Cache keys must be short and printable, so hash arbitrary input
+        return hashlib.sha256(str(username).strip().lower().encode()).hexdigest()
+
+
+class RegisterIPThrottle(TokenBucketThrottle):
+    scope = 'register_ip'
+
+    def get_ident_for(self, request, view):
+        return self.get_ident(request)
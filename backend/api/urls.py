@@ -1,6 +1,10 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import CandidateViewSet, JobOpeningViewSet, ApplicationViewSet, AuthViewSet, NotificationViewSet
+from .views import (
+    CandidateViewSet, JobOpeningViewSet, ApplicationViewSet, AuthViewSet, NotificationViewSet,
+    RoomViewSet, InterviewViewSet, ImportJobViewSet, DuplicateCandidateViewSet,
+    ReportViewSet
+)
 
 router = DefaultRouter()
 router.register(r'candidates', CandidateViewSet)
@@ -8,6 +12,11 @@ router.register(r'jobs', JobOpeningViewSet)
 router.register(r'applications', ApplicationViewSet)
 router.register(r'auth', AuthViewSet, basename='auth')
 router.register(r'notifications', NotificationViewSet, basename='notifications')
+router.register(r'rooms', RoomViewSet)
+router.register(r'interviews', InterviewViewSet, basename='interviews')
+router.register(r'imports', ImportJobViewSet, basename='imports')
+router.register(r'duplicates', DuplicateCandidateViewSet, basename='duplicates')
+router.register(r'reports', ReportViewSet, basename='reports')
 
 urlpatterns = [
     path('', include(router.urls)),
@@ -5,14 +5,86 @@ from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.parsers import MultiPartParser, FormParser
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.models import User
-from django.db.models import Q
-from .models import Candidate, JobOpening, Application, UserProfile, Notification
+from django.db import transaction
+from django.db.models import Q, F
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from datetime import timedelta
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from django.conf import settings
+from .models import Candidate, JobOpening, Application, UserProfile, Notification, Recommendation, Room, Interview, ImportJob, DuplicateCandidatePair
 from .serializers import (
     CandidateSerializer, JobOpeningSerializer, ApplicationSerializer,
-    UserProfileSerializer, NotificationSerializer
+    UserProfileSerializer, NotificationSerializer,
+    JobRecommendationSerializer, CandidateMatchSerializer,
+    RoomSerializer, InterviewSerializer, ImportJobSerializer, ImportJobDetailSerializer,
+    DuplicateCandidatePairSerializer
 )
+from .dedupe import merge_candidates
+from .imports import ImportUploadHandler, file_format
+from .resumes import HashingUploadHandler, store_resume
+from .permissions import allowed_departments, scope_by_department
+from .reports import current_snapshot, date_range
+from .scheduling import find_slots
+from .tasks import notify_new_job, notify_application_submitted, notify_interview_scheduled, run_import
+from .throttling import LoginIPThrottle, LoginUsernameThrottle, RegisterIPThrottle
 
-class CandidateViewSet(viewsets.ModelViewSet):
+def _match_limit(request):
+    try:
+        return max(1, min(int(request.query_params.get('limit', settings.MATCHING_TOP_K)), settings.MATCHING_TOP_K))
+    except ValueError:
+        return settings.MATCHING_TOP_K
+
+def _is_recruiter(user):
+    return hasattr(user, 'profile') and user.profile.role in ('HR', 'MANAGER')
+
+def _list_param(request, name):
+    value = request.query_params.get(name)
+    return [item.strip() for item in value.split(',') if item.strip()] if value else None
+
+def _batch_ids(request):
+    """
+    Ids for a batch action, from `ids` in the body (a list) or the query
+    string (comma-separated). Returns (ids, error response).
+    """
+    if request.method != 'GET' and not isinstance(request.data, dict):
+        return None, Response({'error': 'Request body must be an object'}, status=status.HTTP_400_BAD_REQUEST)
+    ids = request.data.get('ids') if request.method != 'GET' else _list_param(request, 'ids')
+    if not isinstance(ids, list) or not ids:
+        return None, Response({'error': 'ids must be a non-empty list'}, status=status.HTTP_400_BAD_REQUEST)
+    if len(ids) > settings.BATCH_MAX_ITEMS:
+        return None, Response(
+            {'error': f'At most {settings.BATCH_MAX_ITEMS} ids per request'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    try:
+        # dict.fromkeys drops repeats but keeps the caller's order
+        return list(dict.fromkeys(int(pk) for pk in ids)), None
+    except (TypeError, ValueError):
+        return None, Response({'error': 'ids must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+
+class BatchRetrieveMixin:
+    """
+    Adds GET <list>/batch/?ids=1,2,3: the visible objects among `ids` in one
+    query through the viewset's own get_queryset(), so role scoping and
+    select_related apply. Ids that do not exist or are not visible are
+    listed under `missing`.
+    """
+    
+    @action(detail=False, methods=['get'])
+    def batch(self, request):
+        ids, error = _batch_ids(request)
+        if error:
+            return error
+        objects = {obj.pk: obj for obj in self.get_queryset().filter(pk__in=ids)}
+        found = [objects[pk] for pk in ids if pk in objects]
+        return Response({
+            'results': self.get_serializer(found, many=True).data,
+            'missing': [pk for pk in ids if pk not in objects],
+        })
+
+class CandidateViewSet(BatchRetrieveMixin, viewsets.ModelViewSet):
     queryset = Candidate.objects.all()
     serializer_class = CandidateSerializer
     parser_classes = [MultiPartParser, FormParser]
@@ -20,6 +92,20 @@ class CandidateViewSet(viewsets.ModelViewSet):
     def get_permissions(self):
         return [IsAuthenticated()]
     
+    def get_queryset(self):
+        # Department-scoped managers see the candidates who applied to their departments' jobs
+        if allowed_departments(self.request) is None:
+            return Candidate.objects.all()
+        applications = scope_by_department(Application.objects.all(), self.request, 'job__department')
+        return Candidate.objects.filter(id__in=applications.values('candidate_id'))
+    
+    def initialize_request(self, request, *args, **kwargs):
+        drf_request = super().initialize_request(request, *args, **kwargs)
+        if self.action == 'upload_resume':
+            # Stream the upload to the resume store, hashing as it arrives
+            request.upload_handlers = [HashingUploadHandler(request)]
+        return drf_request
+    
     def get_serializer_context(self):
         context = super().get_serializer_context()
         context['request'] = self.request
@@ -50,32 +136,91 @@ class CandidateViewSet(viewsets.ModelViewSet):
         candidate = request.user.profile.candidate
         if 'resume' not in request.FILES:
             return Response({'error': 'No file provided'}, status=status.HTTP_400_BAD_REQUEST)
-        candidate.resume = request.FILES['resume']
-        candidate.save()
+        resume_file, created = store_resume(request.FILES['resume'])
+        candidate.resume_file = resume_file
+        candidate.resume.name = resume_file.file.name
+        candidate.save(update_fields=['resume', 'resume_file'])
         serializer = self.get_serializer(candidate)
         return Response(serializer.data)
+    
+    @action(detail=True, methods=['get'])
+    def recommended_jobs(self, request, pk=None):
+        user = request.user
+        own = hasattr(user, 'profile') and user.profile.candidate_id is not None and str(user.profile.candidate_id) == str(pk)
+        if not own and not _is_recruiter(user):
+            return Response({'error': 'Not allowed to view these recommendations'}, status=status.HTTP_403_FORBIDDEN)
+        recommendations = Recommendation.objects.filter(candidate_id=pk)
+        if not own:
+            if not self.get_queryset().filter(pk=pk).exists():
+                return Response({'error': 'Not allowed to view these recommendations'}, status=status.HTTP_403_FORBIDDEN)
+            recommendations = scope_by_department(recommendations, request, 'job__department')
+        recommendations = recommendations.select_related('job').order_by('-score')[:_match_limit(request)]
+        return Response(JobRecommendationSerializer(recommendations, many=True).data)
+    
+    @action(detail=False, methods=['get'])
+    def search_resumes(self, request):
+        if not _is_recruiter(request.user):
+            return Response({'error': 'Only recruiters can search resumes'}, status=status.HTTP_403_FORBIDDEN)
+        q = request.query_params.get('q', '').strip()
+        if not q:
+            return Response({'error': 'Search query required'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = min(int(request.query_params.get('limit', 50)), 200)
+        except ValueError:
+            limit = 50
+        
+        query = SearchQuery(q, config=settings.RESUME_SEARCH_CONFIG, search_type='websearch')
+        candidates = (
+            self.get_queryset().filter(resume_file__search_vector=query)
+            .annotate(rank=SearchRank(F('resume_file__search_vector'), query))
+            .order_by('-rank')[:limit]
+        )
+        serializer = self.get_serializer(candidates, many=True)
+        return Response(serializer.data)
 
-class JobOpeningViewSet(viewsets.ModelViewSet):
+class JobOpeningViewSet(BatchRetrieveMixin, viewsets.ModelViewSet):
     queryset = JobOpening.objects.all()
     serializer_class = JobOpeningSerializer
     
     def get_permissions(self):
         return [IsAuthenticated()]
     
+    @transaction.atomic
     def perform_create(self, serializer):
         job = serializer.save()
-        # Create notifications for all candidate users when a new job is posted
-        candidate_users = User.objects.filter(profile__role='CANDIDATE')
-        for user in candidate_users:
-            Notification.objects.create(
-                user=user,
-                type='NEW_JOB',
-                title=f'New Job Posting: {job.title}',
-                message=f'A new {job.department} position has been posted: {job.title}',
-                job=job
-            )
+        # Notify all candidate users in the background; the task is only
+        # picked up once the job itself has been committed
+        notify_new_job.delay(job.id)
+    
+    @action(detail=False, methods=['get'])
+    def recommended(self, request):
+        # Jobs ranked for the logged-in candidate
+        if not hasattr(request.user, 'profile') or not request.user.profile.candidate_id:
+            return Response({'error': 'No candidate profile found'}, status=status.HTTP_404_NOT_FOUND)
+        recommendations = (
+            Recommendation.objects.filter(candidate_id=request.user.profile.candidate_id)
+            .select_related('job')
+            .order_by('-score')[:_match_limit(request)]
+        )
+        return Response(JobRecommendationSerializer(recommendations, many=True).data)
+    
+    @action(detail=True, methods=['get'])
+    def matches(self, request, pk=None):
+        # Best-matching candidates for a job, for recruiters
+        if not _is_recruiter(request.user):
+            return Response({'error': 'Only recruiters can view job matches'}, status=status.HTTP_403_FORBIDDEN)
+        job = self.get_object()
+        departments = allowed_departments(request)
+        if departments is not None and job.department not in departments:
+            return Response({'error': 'Not allowed to view matches for this department'}, status=status.HTTP_403_FORBIDDEN)
+        recommendations = (
+            Recommendation.objects.filter(job=job)
+            .select_related('candidate')
+            .order_by('-score')[:_match_limit(request)]
+        )
+        return Response(CandidateMatchSerializer(recommendations, many=True).data)
 
-class ApplicationViewSet(viewsets.ModelViewSet):
+class ApplicationViewSet(BatchRetrieveMixin, viewsets.ModelViewSet):
     queryset = Application.objects.all()
     serializer_class = ApplicationSerializer
     
@@ -84,7 +229,7 @@ class ApplicationViewSet(viewsets.ModelViewSet):
     
     def get_queryset(self):
         user = self.request.user
-        queryset = Application.objects.all().order_by('-applicationDate')
+        queryset = Application.objects.select_related('candidate', 'job').order_by('-applicationDate')
         
         # Role-based filtering
         if hasattr(user, 'profile'):
@@ -94,8 +239,8 @@ class ApplicationViewSet(viewsets.ModelViewSet):
                 # Candidates see only their applications
                 queryset = queryset.filter(candidate=user.profile.candidate)
             elif role == 'MANAGER':
-                # Managers see applications for their department (if we add department to user)
-                pass  # For now, managers see all
+                # Managers see applications for their assigned departments only
+                queryset = scope_by_department(queryset, self.request, 'job__department')
             elif role == 'HR':
                 # HR sees all applications
                 pass
@@ -139,17 +284,12 @@ class ApplicationViewSet(viewsets.ModelViewSet):
         
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        application = serializer.save(candidate_id=candidate_id)
-        
-        # Create notification for the candidate
-        if hasattr(user, 'profile') and user.profile.candidate:
-            Notification.objects.create(
-                user=user,
-                type='APPLICATION_UPDATE',
-                title='Application Submitted',
-                message=f'Your application for {application.job.title} has been received',
-                application=application
-            )
+        with transaction.atomic():
+            application = serializer.save(candidate_id=candidate_id)
+            
+            # Notify the candidate in the background
+            if hasattr(user, 'profile') and user.profile.candidate:
+                notify_application_submitted.delay(application.id, user.id)
         
         headers = self.get_success_headers(serializer.data)
         return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
@@ -178,10 +318,341 @@ class ApplicationViewSet(viewsets.ModelViewSet):
         
         serializer = self.get_serializer(application)
         return Response(serializer.data)
+    
+    @action(detail=False, methods=['post'])
+    def withdraw_batch(self, request):
+        """
+        Withdraw every application in `ids` with one UPDATE. Each id gets a
+        result: withdrawn, already_withdrawn or not_found (which includes
+        applications the user may not withdraw).
+        """
+        ids, error = _batch_ids(request)
+        if error:
+            return error
+        queryset = self.get_queryset()
+        user = request.user
+        if hasattr(user, 'profile') and user.profile.role == 'CANDIDATE':
+            # Same rule as withdraw: candidates only touch their own applications
+            queryset = queryset.filter(candidate_id=user.profile.candidate_id)
+        
+        with transaction.atomic():
+            rows = (
+                queryset.filter(pk__in=ids)
+                .select_for_update(of=('self',))
+                .values_list('id', 'job_id', 'status')
+            )
+            current = {pk: (job_id, app_status) for pk, job_id, app_status in rows}
+            to_withdraw = [pk for pk, (_, app_status) in current.items() if app_status != 'Withdrawn']
+            Application.objects.filter(pk__in=to_withdraw).update(status='Withdrawn')
+            
+            # The UPDATE bypasses Application.save(), so move the counters here, one UPDATE per job
+            deltas = {}
+            for pk in to_withdraw:
+                job_id, app_status = current[pk]
+                job_deltas = deltas.setdefault(job_id, {})
+                for field, delta in Application.counter_deltas(app_status, -1).items():
+                    job_deltas[field] = job_deltas.get(field, 0) + delta
+                for field, delta in Application.counter_deltas('Withdrawn').items():
+                    job_deltas[field] = job_deltas.get(field, 0) + delta
+            for job_id, job_deltas in deltas.items():
+                JobOpening.adjust_counters(job_id, job_deltas)
+        
+        withdrawn = set(to_withdraw)
+        results = [
+            {'id': pk, 'result': 'withdrawn' if pk in withdrawn else 'already_withdrawn' if pk in current else 'not_found'}
+            for pk in ids
+        ]
+        return Response({'withdrawn': len(withdrawn), 'results': results})
+
+class RoomViewSet(viewsets.ModelViewSet):
+    queryset = Room.objects.all().order_by('name')
+    serializer_class = RoomSerializer
+    
+    def get_permissions(self):
+        return [IsAuthenticated()]
+    
+    def _forbidden(self):
+        return Response({'error': 'Only recruiters can manage rooms'}, status=status.HTTP_403_FORBIDDEN)
+    
+    def create(self, request, *args, **kwargs):
+        if not _is_recruiter(request.user):
+            return self._forbidden()
+        return super().create(request, *args, **kwargs)
+    
+    def update(self, request, *args, **kwargs):
+        if not _is_recruiter(request.user):
+            return self._forbidden()
+        return super().update(request, *args, **kwargs)
+    
+    def destroy(self, request, *args, **kwargs):
+        if not _is_recruiter(request.user):
+            return self._forbidden()
+        return super().destroy(request, *args, **kwargs)
+
+class InterviewViewSet(viewsets.ModelViewSet):
+    serializer_class = InterviewSerializer
+    
+    def get_permissions(self):
+        return [IsAuthenticated()]
+    
+    def get_queryset(self):
+        user = self.request.user
+        queryset = Interview.objects.select_related(
+            'application__candidate', 'application__job'
+        ).prefetch_related('interviewers')
+        
+        if hasattr(user, 'profile') and user.profile.role == 'CANDIDATE':
+            queryset = queryset.filter(application__candidate=user.profile.candidate)
+        else:
+            queryset = scope_by_department(queryset, self.request, 'application__job__department')
+        
+        # Filter by interviewer if provided
+        interviewer = self.request.query_params.get('interviewer')
+        if interviewer is not None:
+            queryset = queryset.filter(assignments__interviewer_id=interviewer)
+        
+        # Filter by status if provided
+        status_filter = self.request.query_params.get('status')
+        if status_filter is not None:
+            queryset = queryset.filter(status=status_filter)
+        
+        return queryset
+    
+    def create(self, request, *args, **kwargs):
+        if not _is_recruiter(request.user):
+            return Response({'error': 'Only recruiters can schedule interviews'}, status=status.HTTP_403_FORBIDDEN)
+        return super().create(request, *args, **kwargs)
+    
+    # Rescheduling goes through the same conflict checks, so it is a recruiter action too
+    def update(self, request, *args, **kwargs):
+        if not _is_recruiter(request.user):
+            return Response({'error': 'Only recruiters can change interviews'}, status=status.HTTP_403_FORBIDDEN)
+        return super().update(request, *args, **kwargs)
+    
+    def destroy(self, request, *args, **kwargs):
+        if not _is_recruiter(request.user):
+            return Response({'error': 'Only recruiters can delete interviews'}, status=status.HTTP_403_FORBIDDEN)
+        return super().destroy(request, *args, **kwargs)
+    
+    @transaction.atomic
+    def perform_create(self, serializer):
+        interview = serializer.save()
+        application = interview.application
+        if application.status in ('Received', 'Under Review'):
+            application.status = 'Interview'
+            application.save()
+        notify_interview_scheduled.delay(interview.id)
+    
+    @action(detail=False, methods=['get'])
+    def availability(self, request):
+        """
+        Earliest slots when all `interviewers` (comma-separated user ids) are
+        free, optionally in one of `rooms`, within working hours.
+        """
+        params = request.query_params
+        try:
+            interviewer_ids = [int(i) for i in params.get('interviewers', '').split(',') if i]
+            room_ids = [int(i) for i in params.get('rooms', '').split(',') if i]
+            duration = timedelta(minutes=int(params.get('duration', 60)))
+            step = timedelta(minutes=int(params.get('step', 30)))
+            limit = min(int(params.get('limit', 10)), 100)
+            day_start = int(params.get('day_start', 9))
+            day_end = int(params.get('day_end', 17))
+            tz = ZoneInfo(params.get('tz', settings.TIME_ZONE))
+            # Well-formed but impossible dates such as 2026-02-30 raise ValueError
+            start = parse_datetime(params['start']) if params.get('start') else timezone.now()
+            end = parse_datetime(params['end']) if params.get('end') else None
+        except (ValueError, ZoneInfoNotFoundError):
+            return Response({'error': 'Invalid availability parameters'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        if start is None or (end is None and params.get('end')):
+            return Response({'error': 'Invalid start or end'}, status=status.HTTP_400_BAD_REQUEST)
+        end = end or start + timedelta(days=14)
+        if timezone.is_naive(start):
+            start = timezone.make_aware(start, tz)
+        if timezone.is_naive(end):
+            end = timezone.make_aware(end, tz)
+        if not interviewer_ids:
+            return Response({'error': 'At least one interviewer is required'}, status=status.HTTP_400_BAD_REQUEST)
+        if end <= start or end - start > timedelta(days=settings.INTERVIEW_SEARCH_MAX_DAYS):
+            return Response({'error': f'Search window must be between 0 and {settings.INTERVIEW_SEARCH_MAX_DAYS} days'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if not (0 <= day_start < day_end <= 24) or duration.total_seconds() <= 0 or step.total_seconds() <= 0:
+            return Response({'error': 'Invalid availability parameters'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        slots = find_slots(
+            interviewer_ids, start, end, duration,
+            room_ids=room_ids, step=step, limit=limit,
+            day_start=day_start, day_end=day_end, tz=tz,
+            weekends=params.get('weekends') == 'true',
+        )
+        return Response({'slots': slots})
+
+class DuplicateCandidateViewSet(viewsets.ReadOnlyModelViewSet):
+    """Likely duplicate candidates found by `manage.py finddupes`, best matches first."""
+    serializer_class = DuplicateCandidatePairSerializer
+    
+    def get_permissions(self):
+        return [IsAuthenticated()]
+    
+    def get_queryset(self):
+        user = self.request.user
+        if not hasattr(user, 'profile') or user.profile.role != 'HR':
+            return DuplicateCandidatePair.objects.none()
+        status_filter = self.request.query_params.get('status', 'PENDING')
+        return (
+            DuplicateCandidatePair.objects.filter(status=status_filter)
+            .select_related('candidate_a', 'candidate_b')
+            .order_by('-score')
+        )
+    
+    @action(detail=True, methods=['post'])
+    def merge(self, request, pk=None):
+        """Merge the pair into `keep` (either candidate's id; defaults to the older one)."""
+        pair = self.get_object()
+        keep = request.data.get('keep', pair.candidate_a_id)
+        if str(keep) not in (str(pair.candidate_a_id), str(pair.candidate_b_id)):
+            return Response({'error': 'keep must be one of the two candidates'}, status=status.HTTP_400_BAD_REQUEST)
+        keep = int(keep)
+        other = pair.candidate_b_id if keep == pair.candidate_a_id else pair.candidate_a_id
+        candidate = merge_candidates(keep, [other])
+        return Response(CandidateSerializer(candidate, context={'request': request}).data)
+    
+    @action(detail=True, methods=['post'])
+    def dismiss(self, request, pk=None):
+        pair = self.get_object()
+        pair.status = 'DISMISSED'
+        pair.save(update_fields=['status'])
+        return Response(self.get_serializer(pair).data)
+
+class ImportJobViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Bulk candidate/application imports. POST a CSV or NDJSON file as `file`
+    (format from the extension, or `format=csv|ndjson`); it is processed in
+    the background and GET /imports/<id>/ reports progress and row errors.
+    """
+    parser_classes = [MultiPartParser, FormParser]
+    
+    def get_permissions(self):
+        return [IsAuthenticated()]
+    
+    def initialize_request(self, request, *args, **kwargs):
+        drf_request = super().initialize_request(request, *args, **kwargs)
+        if request.method == 'POST':
+            # Spool straight to disk; import files can be far larger than memory allows
+            request.upload_handlers = [ImportUploadHandler(request)]
+        return drf_request
+    
+    def get_queryset(self):
+        user = self.request.user
+        if not hasattr(user, 'profile') or user.profile.role != 'HR':
+            return ImportJob.objects.none()
+        return ImportJob.objects.order_by('-created_at')
+    
+    def get_serializer_class(self):
+        if self.action == 'retrieve':
+            return ImportJobDetailSerializer
+        return ImportJobSerializer
+    
+    def create(self, request):
+        if not hasattr(request.user, 'profile') or request.user.profile.role != 'HR':
+            return Response({'error': 'Only HR can import applicants'}, status=status.HTTP_403_FORBIDDEN)
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({'error': 'No file provided'}, status=status.HTTP_400_BAD_REQUEST)
+        fmt = file_format(upload.name, request.data.get('format'))
+        if fmt is None:
+            return Response({'error': 'Format must be csv or ndjson'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        with transaction.atomic():
+            import_job = ImportJob(created_by=request.user, original_name=(upload.name or '')[:255], format=fmt)
+            import_job.file.save(upload.name, upload, save=False)
+            import_job.save()
+            run_import.delay(import_job.id)
+        import_job.refresh_from_db()
+        serializer = self.get_serializer(import_job)
+        return Response(serializer.data, status=status.HTTP_202_ACCEPTED)
+
+class ReportViewSet(viewsets.ViewSet):
+    """
+    Recruitment reports served from the latest columnar snapshot written by
+    `manage.py buildreportsnapshot`, never from the live tables. Every
+    response carries the snapshot's `generated_at` and `age_seconds`.
+    
+    Filters (all optional): department, status, job (comma-separated),
+    start/end (ISO dates) or days (window ending today).
+    """
+    
+    def get_permissions(self):
+        return [IsAuthenticated()]
+    
+    def _report(self, request, build):
+        if not _is_recruiter(request.user):
+            return Response({'error': 'Only recruiters can view reports'}, status=status.HTTP_403_FORBIDDEN)
+        snapshot = current_snapshot()
+        if snapshot is None:
+            return Response({'error': 'No report snapshot yet; run buildreportsnapshot'}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        
+        departments = _list_param(request, 'department')
+        allowed = allowed_departments(request)
+        if allowed is not None:
+            departments = [d for d in (departments if departments is not None else allowed) if d in allowed]
+        jobs = _list_param(request, 'job')
+        if jobs is not None and not all(job.isdigit() for job in jobs):
+            return Response({'error': 'job must be a list of ids'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            start, end = date_range(request.query_params)
+        except ValueError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        mask = snapshot.mask(
+            departments=departments,
+            statuses=_list_param(request, 'status'),
+            jobs=[int(job) for job in jobs] if jobs is not None else None,
+            start=start,
+            end=end,
+        )
+        generated_at = parse_datetime(snapshot.generated_at)
+        return Response({
+            'generated_at': snapshot.generated_at,
+            'age_seconds': round((timezone.now() - generated_at).total_seconds()),
+            'results': build(snapshot, mask, departments),
+        })
+    
+    @action(detail=False, methods=['get'])
+    def summary(self, request):
+        return self._report(request, lambda snapshot, mask, departments: snapshot.summary(mask, departments))
+    
+    @action(detail=False, methods=['get'])
+    def breakdown(self, request):
+        by = request.query_params.get('by', 'department')
+        if by not in ('department', 'status', 'job'):
+            return Response({'error': 'by must be department, status or job'}, status=status.HTTP_400_BAD_REQUEST)
+        return self._report(request, lambda snapshot, mask, departments: snapshot.group_by(mask, by))
+    
+    @action(detail=False, methods=['get'])
+    def timeseries(self, request):
+        interval = request.query_params.get('interval', 'day')
+        split = request.query_params.get('split')
+        if interval not in ('day', 'week', 'month') or split not in (None, 'department', 'status'):
+            return Response(
+                {'error': 'interval must be day, week or month; split must be department or status'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return self._report(request, lambda snapshot, mask, departments: snapshot.time_series(mask, interval, split))
 
 class AuthViewSet(viewsets.ViewSet):
     permission_classes = [AllowAny]
     
+    def get_throttles(self):
+        # Throttles run in initial(), before any password hashing happens
+        if not settings.LOGIN_THROTTLE_ENABLED:
+            return []
+        if self.action == 'login':
+            return [LoginIPThrottle(), LoginUsernameThrottle()]
+        if self.action == 'register':
+            return [RegisterIPThrottle()]
+        return []
+    
     @action(detail=False, methods=['post'])
     def login(self, request):
         username = request.data.get('username')
@@ -193,6 +664,13 @@ class AuthViewSet(viewsets.ViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
+        # Skip the expensive password hash entirely for unknown usernames
+        if not User.objects.filter(username=username).exists():
+            return Response(
+                {'error': 'Invalid credentials'},
+                status=status.HTTP_401_UNAUTHORIZED
+            )
+        
         user = authenticate(request, username=username, password=password)
         if user is not None:
             login(request, user)
@@ -281,6 +759,44 @@ class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
         notification.save()
         return Response({'message': 'Notification marked as read'})
     
+    @action(detail=False, methods=['post'])
+    def mark_read_batch(self, request):
+        """
+        Mark several notifications read in one UPDATE: either `ids` (a list,
+        answered per id with marked, already_read or not_found) or a cursor
+        range `from_id`..`to_id` (inclusive, either end optional), such as
+        everything up to the newest notification the user has seen.
+        """
+        queryset = Notification.objects.filter(user=request.user)
+        if not isinstance(request.data, dict):
+            return Response({'error': 'Request body must be an object'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        if 'ids' not in request.data:
+            try:
+                from_id = int(request.data['from_id']) if request.data.get('from_id') is not None else None
+                to_id = int(request.data['to_id']) if request.data.get('to_id') is not None else None
+            except (TypeError, ValueError):
+                return Response({'error': 'from_id and to_id must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+            if from_id is None and to_id is None:
+                return Response({'error': 'Provide ids or a from_id/to_id range'}, status=status.HTTP_400_BAD_REQUEST)
+            if from_id is not None:
+                queryset = queryset.filter(id__gte=from_id)
+            if to_id is not None:
+                queryset = queryset.filter(id__lte=to_id)
+            marked = queryset.filter(is_read=False).update(is_read=True)
+            return Response({'marked': marked})
+        
+        ids, error = _batch_ids(request)
+        if error:
+            return error
+        read = dict(queryset.filter(id__in=ids).values_list('id', 'is_read'))
+        marked = queryset.filter(id__in=ids, is_read=False).update(is_read=True)
+        results = [
+            {'id': pk, 'result': 'not_found' if pk not in read else 'already_read' if read[pk] else 'marked'}
+            for pk in ids
+        ]
+        return Response({'marked': marked, 'results': results})
+    
     @action(detail=False, methods=['post'])
     def mark_all_read(self, request):
         Notification.objects.filter(user=request.user, is_read=False).update(is_read=True)
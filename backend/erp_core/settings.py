@@ -23,6 +23,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'api.middleware.QueryCountMiddleware',  # X-DB-Queries header, see QUERY_COUNT_HEADER
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware', # CORS
     'django.middleware.common.CommonMiddleware',
@@ -73,6 +74,68 @@ MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Notification retention: read notifications older than this are pruned by
+# `manage.py prunenotifications`, which deletes in batches of this size.
+NOTIFICATION_RETENTION_DAYS = int(os.environ.get('NOTIFICATION_RETENTION_DAYS', 90))
+NOTIFICATION_PRUNE_BATCH_SIZE = int(os.environ.get('NOTIFICATION_PRUNE_BATCH_SIZE', 5000))
+
+# Optional monthly range partitioning of notifications (PostgreSQL only),
+# enabled once with `manage.py partitionnotifications --convert`.
+NOTIFICATION_PARTITION_MONTHS_AHEAD = int(os.environ.get('NOTIFICATION_PARTITION_MONTHS_AHEAD', 3))
+NOTIFICATION_PARTITION_RETENTION_MONTHS = int(os.environ.get('NOTIFICATION_PARTITION_RETENTION_MONTHS', 12))
+
+# Database-backed task queue (api/queue.py), processed by `manage.py runworker`.
+# With TASK_QUEUE_EAGER tasks run in the web process after commit instead.
+TASK_QUEUE_EAGER = os.environ.get('TASK_QUEUE_EAGER', 'false').lower() == 'true'
+TASK_QUEUE_MAX_ATTEMPTS = int(os.environ.get('TASK_QUEUE_MAX_ATTEMPTS', 5))
+TASK_QUEUE_BACKOFF = 5  # seconds before the first retry, doubled on each attempt
+TASK_QUEUE_MAX_BACKOFF = 3600
+TASK_QUEUE_LOCK_TIMEOUT = 600  # running tasks without a heartbeat for this long are assumed lost
+TASK_QUEUE_HEARTBEAT_INTERVAL = 60  # workers refresh their running tasks' locks this often
+TASK_QUEUE_RETENTION_HOURS = 24  # completed tasks are purged after this long
+TASK_QUEUE_MAINTENANCE_INTERVAL = 300
+
+# Content-addressed resume store (api/resumes.py)
+RESUME_MAX_UPLOAD_SIZE = int(os.environ.get('RESUME_MAX_UPLOAD_SIZE', 10 * 1024 * 1024))
+RESUME_EXTRACTION_PROCESSES = int(os.environ.get('RESUME_EXTRACTION_PROCESSES', 2))
+RESUME_EXTRACTION_TIMEOUT = 120  # seconds
+RESUME_TEXT_MAX_CHARS = 200000
+RESUME_SEARCH_CONFIG = 'english'  # PostgreSQL text search configuration
+
+# Candidate/job matching (api/matching.py)
+MATCHING_TOP_K = int(os.environ.get('MATCHING_TOP_K', 50))  # matches kept per candidate and per job
+MATCHING_MIN_SCORE = 0.05  # cosine similarity below this is not a match
+MATCHING_CHUNK_SIZE = 2000  # candidates scored per matrix product
+# Job refreshes keep up to this many candidate vectors in memory; above it they stream them from the database
+MATCHING_CANDIDATE_CACHE_SIZE = int(os.environ.get('MATCHING_CANDIDATE_CACHE_SIZE', 50000))
+
+# Interview scheduling (api/scheduling.py). Capping interview length lets
+# overlap checks use a bounded index range on start time.
+INTERVIEW_MAX_MINUTES = 480
+INTERVIEW_SEARCH_MAX_DAYS = 60
+
+# Bulk applicant import (api/imports.py)
+IMPORT_MAX_UPLOAD_SIZE = int(os.environ.get('IMPORT_MAX_UPLOAD_SIZE', 200 * 1024 * 1024))
+IMPORT_CHUNK_SIZE = 1000  # rows validated and written per transaction
+IMPORT_MAX_ERRORS = 1000  # rejected rows kept in the error report
+
+# Duplicate-candidate detection (api/dedupe.py)
+DEDUPE_MIN_SCORE = 0.85  # pairs scoring below this are not reported
+DEDUPE_MAX_BUCKET = 50  # blocking buckets larger than this are too common to compare
+
+# Columnar report snapshots (api/reports.py), written by
+# `manage.py buildreportsnapshot` and read by /api/reports/
+REPORT_SNAPSHOT_DIR = os.environ.get('REPORT_SNAPSHOT_DIR', os.path.join(BASE_DIR, 'report_snapshots'))
+REPORT_SNAPSHOT_KEEP = 3  # snapshot directories kept on disk
+REPORT_MAX_DAYS = 3650  # longest `days` window a report accepts
+
+# Largest id list accepted by the batch endpoints (batch, withdraw_batch, mark_read_batch)
+BATCH_MAX_ITEMS = 500
+
+# Per-request SQL query count/time response headers (api/middleware.py),
+# read by `manage.py loadtest`
+QUERY_COUNT_HEADER = os.environ.get('QUERY_COUNT_HEADER', str(DEBUG)).lower() == 'true'
+
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:3000",
     "http://127.0.0.1:3000",
@@ -87,4 +150,17 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    # Token buckets for AuthViewSet (see api/throttling.py): capacity/refill period
+    'DEFAULT_THROTTLE_RATES': {
+        'login_ip': os.environ.get('LOGIN_IP_RATE', '30/min'),
+        'login_username': os.environ.get('LOGIN_USERNAME_RATE', '5/min'),
+        'register_ip': os.environ.get('REGISTER_IP_RATE', '10/hour'),
+    },
+    # Reverse proxies in front of Django. The per-IP throttles key on the
+    # client address, so X-Forwarded-For is only trusted for this many hops;
+    # with 0 it is ignored and REMOTE_ADDR is used.
+    'NUM_PROXIES': int(os.environ.get('NUM_PROXIES', 0)),
 }
+
+# Set to False to disable login/register throttling (e.g. for benchmarks)
+LOGIN_THROTTLE_ENABLED = os.environ.get('LOGIN_THROTTLE_ENABLED', 'true').lower() == 'true'